@@ -1,6 +1,21 @@
 """Amy - Personal AI Agent."""
 
-from .orchestrator import Orchestrator
-from .memory import MemorySystem
+import importlib
+
+# Exports are resolved on first access so that importing a lightweight
+# submodule does not pull in langchain/langgraph.
+_EXPORTS = {
+    "Orchestrator": ".orchestrator",
+    "MemorySystem": ".memory",
+}
 
 __all__ = ["Orchestrator", "MemorySystem"]
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
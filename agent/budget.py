@@ -0,0 +1,215 @@
+"""Per-turn budgets and cooperative cancellation.
+
+A TurnBudget bounds one agent turn by wall-clock deadline, ReAct steps
+and LLM tokens. The active budget is held in a context variable so tools
+running in worker threads can check for cancellation cheaply.
+"""
+
+import asyncio
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+from langchain_core.callbacks import BaseCallbackHandler
+
+import config
+from .llm import estimate_tokens
+
+
+class BudgetExceeded(Exception):
+    """Raised when a turn runs out of budget or is cancelled."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class TurnBudget:
+    """Limits for one agent turn."""
+
+    def __init__(
+        self,
+        deadline_s: Optional[float] = None,
+        max_steps: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+    ):
+        """Initialize turn budget.
+
+        Args:
+            deadline_s: Wall-clock limit in seconds (from config.py; 0 = none)
+            max_steps: Maximum ReAct steps (from config.py)
+            max_tokens: Maximum LLM tokens (from config.py; 0 = none)
+        """
+        self.deadline_s = config.TURN_TIMEOUT_S if deadline_s is None else deadline_s
+        self.max_steps = config.TURN_MAX_STEPS if max_steps is None else max_steps
+        self.max_tokens = config.TURN_TOKEN_BUDGET if max_tokens is None else max_tokens
+        self.started = time.monotonic()
+        self.tokens_used = 0
+        self._cancelled = threading.Event()
+        self._listeners: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self.reason: Optional[str] = None
+
+    @property
+    def recursion_limit(self) -> int:
+        """LangGraph recursion limit for the step budget (model + tools per step)."""
+        return 2 * self.max_steps + 1
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline (None if there is no deadline)."""
+        if not self.deadline_s:
+            return None
+        return max(0.0, self.deadline_s - (time.monotonic() - self.started))
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Ask everything working on this turn to stop.
+
+        Safe to call from any thread or a signal handler.
+        """
+        with self._lock:
+            if self._cancelled.is_set():
+                return
+            self.reason = reason
+            self._cancelled.set()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener()
+
+    def cancelled_future(self) -> asyncio.Future:
+        """Future on the running loop that resolves when the turn is cancelled."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve() -> None:
+            if not future.done():
+                future.set_result(self.reason)
+
+        with self._lock:
+            if not self._cancelled.is_set():
+                self._listeners.append(lambda: loop.call_soon_threadsafe(resolve))
+                return future
+        resolve()
+        return future
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def add_tokens(self, tokens: int) -> None:
+        """Account for LLM tokens used by the turn.
+
+        Crossing the budget does not cancel the turn by itself: a finished
+        LLM call keeps its result and the turn stops before the next call.
+        """
+        self.tokens_used += tokens
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether the token budget is used up."""
+        return bool(self.max_tokens) and self.tokens_used >= self.max_tokens
+
+    def check_call(self) -> None:
+        """Raise if no further LLM call may start.
+
+        Raises:
+            BudgetExceeded: If the turn must stop or the token budget is used up
+        """
+        if self.exhausted:
+            self.cancel("token budget")
+        self.check()
+
+    def check(self) -> None:
+        """Raise if the turn should stop.
+
+        Raises:
+            BudgetExceeded: If cancelled, past the deadline or over budget
+        """
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            self.cancel("deadline")
+        if self.cancelled:
+            raise BudgetExceeded(self.reason or "cancelled")
+
+
+_current_budget: ContextVar[Optional[TurnBudget]] = ContextVar("amy_turn_budget", default=None)
+
+
+def set_current_budget(budget: Optional[TurnBudget]) -> Any:
+    """Make a budget current for this context; returns a reset token."""
+    return _current_budget.set(budget)
+
+
+def get_current_budget() -> Optional[TurnBudget]:
+    """Budget of the turn running in this context (None outside a turn)."""
+    return _current_budget.get()
+
+
+def reset_current_budget(token: Any) -> None:
+    """Restore the budget that was current before set_current_budget."""
+    _current_budget.reset(token)
+
+
+def check_cancelled() -> None:
+    """Raise BudgetExceeded if the current turn was cancelled.
+
+    Cheap enough to call inside tool loops; a no-op outside a turn.
+    """
+    budget = _current_budget.get()
+    if budget is not None:
+        budget.check()
+
+
+class BudgetCallbackHandler(BaseCallbackHandler):
+    """Counts LLM tokens against a budget and aborts calls that must not run."""
+
+    raise_error = True
+
+    def __init__(self, budget: TurnBudget):
+        """Initialize callback handler.
+
+        Args:
+            budget: Budget to account against
+        """
+        super().__init__()
+        self.budget = budget
+        self._counted: dict[Any, int] = {}  # run id -> tokens charged before usage is reported
+        self._lock = threading.Lock()
+
+    def _charge(self, run_id: Any, tokens: int) -> None:
+        with self._lock:
+            self._counted[run_id] = self._counted.get(run_id, 0) + tokens
+            self.budget.add_tokens(tokens)
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, **kwargs: Any) -> None:
+        """Refuse to start an LLM call once the turn must stop; charge its prompt."""
+        self.budget.check_call()
+        self._charge(kwargs.get("run_id"), sum(estimate_tokens(batch, 0) for batch in messages))
+
+    def on_llm_start(self, serialized: Any, prompts: Any, **kwargs: Any) -> None:
+        self.budget.check_call()
+        self._charge(kwargs.get("run_id"), sum(len(prompt) // 4 for prompt in prompts))
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        """Count a streamed token and stop the response once over budget."""
+        self._charge(kwargs.get("run_id"), 1)
+        if self.budget.exhausted:
+            self.budget.cancel("token budget")
+        self.budget.check()
+
+    def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        """Replace the prompt and streaming estimate with the call's reported usage."""
+        tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    tokens += usage.get("total_tokens", 0)
+        with self._lock:
+            counted = self._counted.pop(kwargs.get("run_id"), 0)
+            if tokens:
+                self.budget.add_tokens(tokens - counted)
+
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+        # The prompt was sent; keep its estimate charged
+        with self._lock:
+            self._counted.pop(kwargs.get("run_id"), None)
@@ -0,0 +1,171 @@
+"""Background consolidation of episodic turns into semantic memory.
+
+A worker task reads conversation turns logged since its high-water mark,
+asks the model (at batch priority) for durable facts and preferences,
+and appends them to semantic memory, where near-duplicates are merged.
+It runs after turns and when idle, never on the interactive path.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+from typing import Any, Optional
+import structlog
+
+import config
+from .memory import MemorySystem
+
+logger = structlog.get_logger(__name__)
+
+EXTRACT_PROMPT = """Below is part of a conversation between a user and their assistant.
+
+{turns}
+
+List durable facts about the user worth remembering in later conversations:
+preferences, background, goals, projects, people and recurring tasks. Skip
+anything only relevant to this conversation. Write one fact per line as a
+markdown bullet ("- ..."), in the third person. If there is nothing worth
+keeping, answer NONE."""
+
+
+def parse_facts(text: str) -> list[str]:
+    """Extract bullet facts from a model reply.
+
+    Args:
+        text: Model reply
+
+    Returns:
+        Facts without their bullet markers
+    """
+    facts = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line[:1] in ("-", "*") and len(line) > 2:
+            facts.append(line[1:].strip())
+    return facts
+
+
+class ConsolidationWorker:
+    """Turns new episodic entries into semantic memory, off the request path."""
+
+    def __init__(
+        self,
+        memory: MemorySystem,
+        llm: Any,
+        batch_turns: Optional[int] = None,
+        delay_s: Optional[float] = None,
+        idle_s: Optional[float] = None,
+    ):
+        """Initialize consolidation worker.
+
+        Args:
+            memory: Memory system to consolidate
+            llm: Chat model for fact extraction (should use BATCH priority)
+            batch_turns: Turns per extraction call (from config.py)
+            delay_s: Quiet time after a turn before consolidating (from config.py)
+            idle_s: Consolidate leftovers after this long without turns (from config.py)
+        """
+        self.memory = memory
+        self.llm = llm
+        self.batch_turns = batch_turns or config.CONSOLIDATION_BATCH_TURNS
+        self.delay_s = config.CONSOLIDATION_DELAY_S if delay_s is None else delay_s
+        self.idle_s = idle_s or config.CONSOLIDATION_IDLE_S
+        self.state_file = memory.semantic_file.with_name("consolidation.json")
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"runs": 0, "turns": 0, "facts": 0, "llm_calls": 0, "errors": 0}
+
+    def _load_mark(self) -> Optional[datetime]:
+        """Timestamp of the last consolidated turn."""
+        try:
+            return datetime.fromisoformat(json.loads(self.state_file.read_text())["high_water"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save_mark(self, mark: datetime) -> None:
+        tmp = self.state_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"high_water": mark.isoformat()}))
+        tmp.replace(self.state_file)
+
+    def pending_turns(self) -> list[dict]:
+        """Turns logged after the high-water mark, oldest first."""
+        mark = self._load_mark()
+        now = datetime.now()
+        start = mark or now - timedelta(days=config.CONSOLIDATION_LOOKBACK_DAYS)
+        turns = self.memory.get_turns(start, now)
+        return [t for t in turns if mark is None or datetime.fromisoformat(t["timestamp"]) > mark]
+
+    async def consolidate(self, min_turns: int = 1) -> int:
+        """Consolidate pending turns into semantic memory.
+
+        The high-water mark advances after each batch, so an interrupted
+        run resumes where it stopped and no turn is processed twice.
+
+        Args:
+            min_turns: Do nothing unless at least this many turns are pending
+
+        Returns:
+            Number of facts written
+        """
+        turns = self.pending_turns()
+        if len(turns) < min_turns:
+            return 0
+
+        written = 0
+        self.stats["runs"] += 1
+        for i in range(0, len(turns), self.batch_turns):
+            batch = turns[i:i + self.batch_turns]
+            transcript = "\n\n".join(
+                f"{t['role'].upper()}: {t['content'][:config.CONSOLIDATION_MAX_TURN_CHARS]}"
+                for t in batch
+            )
+            reply = await self.llm.ainvoke(EXTRACT_PROMPT.format(turns=transcript))
+            self.stats["llm_calls"] += 1
+            facts = parse_facts(str(reply.content))
+            if facts:
+                self.memory.write_semantic_memory("\n".join(f"- {f}" for f in facts))
+            self._save_mark(datetime.fromisoformat(batch[-1]["timestamp"]))
+            self.stats["turns"] += len(batch)
+            written += len(facts)
+
+        logger.info("Consolidated memory", turns=len(turns), facts=written)
+        self.stats["facts"] += written
+        return written
+
+    def notify(self) -> None:
+        """Tell the worker a turn finished; starts it on first call.
+
+        Must be called from the event loop the worker should run on.
+        """
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.idle_s)
+                self._wake.clear()
+                # Let a burst of turns settle before consolidating
+                await asyncio.sleep(self.delay_s)
+                min_turns = config.CONSOLIDATION_MIN_TURNS
+            except asyncio.TimeoutError:
+                min_turns = 1  # Idle: flush whatever is left
+            try:
+                await self.consolidate(min_turns=min_turns)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error("consolidation_error", error=str(e))
+
+    async def stop(self) -> None:
+        """Stop the worker; pending turns are picked up next time."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,191 @@
+"""Near-duplicate detection for semantic memory.
+
+Each fact line is reduced to the set of its stemmed content words, and
+two facts whose sets have a Jaccard similarity at or above a threshold
+are treated as the same fact. This way restatements such as "Remember I
+prefer dark mode", "Prefers dark mode" and "Prefers dark mode in the
+editor" do not pile up in the system prompt. Facts are short, so exact
+set similarity is cheap; the sets of the existing file are kept in a
+signature index next to it, so a write only processes the new lines.
+"""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Optional
+
+# Similarity at which two facts count as one. Restatements of real facts
+# score 0.75-1.0 ("prefers dark mode" / "prefers dark mode in the editor"
+# is 0.75); facts differing in their subject score 0.6 or less ("has a dog
+# named Rex" / "has a cat named Rex", "works on Apollo" / "works on Zeus").
+DEFAULT_THRESHOLD = 0.7
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Lines that carry no fact of their own
+PLACEHOLDER_RE = re.compile(r"^[-*]?\s*(\*\*[^*]+\*\*:\s*)?(\(to be filled\))?\s*$")
+
+# Function words and the phrasing people use to ask for a fact to be kept
+STOPWORDS = {
+    "a", "about", "also", "always", "am", "an", "and", "any", "are", "as", "at",
+    "be", "by", "for", "from", "he", "her", "his", "i", "im", "in", "is", "it",
+    "just", "keep", "m", "me", "mind", "my", "note", "of", "on", "or", "please",
+    "really", "remember", "she", "so", "that", "the", "their", "them", "they",
+    "this", "to", "user", "users", "very", "was", "with",
+}
+
+
+def normalize(line: str) -> str:
+    """Strip list markers and markdown emphasis from a fact line."""
+    return re.sub(r"^\s*(?:[-*+]|\d+\.)\s+", "", line).replace("**", "").replace("`", "").strip()
+
+
+def is_fact(line: str) -> bool:
+    """Whether a line is a fact to deduplicate (not a heading, blank or placeholder)."""
+    stripped = line.strip()
+    if not stripped or stripped.startswith("#"):
+        return False
+    return not PLACEHOLDER_RE.match(stripped)
+
+
+def stem(word: str) -> str:
+    """Reduce a word to a crude stem ("prefers", "preferred" -> "prefer").
+
+    Only needs to map inflections of the same word together, not to
+    produce real words ("likes", "liked", "like" -> "lik").
+    """
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    for suffix in ("ing", "ed", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix) and not word.endswith("ss"):
+            word = word[: -len(suffix)]
+            # "preferr" -> "prefer", but keep "install"
+            if suffix != "s" and len(word) > 3 and word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]
+            break
+    return word[:-1] if len(word) > 3 and word.endswith("e") else word
+
+
+def fact_terms(text: str) -> frozenset[str]:
+    """Stemmed content words of a fact.
+
+    Args:
+        text: Fact text
+
+    Returns:
+        Word set (empty if the text has no content words)
+    """
+    return frozenset(
+        stem(w) for w in WORD_RE.findall(normalize(text).lower()) if w not in STOPWORDS
+    )
+
+
+def similarity(a: frozenset[str], b: frozenset[str]) -> float:
+    """Jaccard similarity of two word sets (0 if either is empty)."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def line_key(line: str) -> str:
+    """Stable key of a fact line in the signature index."""
+    return hashlib.sha1(normalize(line).lower().encode()).hexdigest()[:16]
+
+
+class SignatureIndex:
+    """Persisted word sets of the fact lines in one file."""
+
+    def __init__(self, path: Path, threshold: float = DEFAULT_THRESHOLD):
+        """Initialize signature index.
+
+        Args:
+            path: Index file (JSON)
+            threshold: Word sets at least this similar are near-duplicates
+        """
+        self.path = path
+        self.threshold = threshold
+        self.signatures: dict[str, frozenset[str]] = {}
+        self._stamp: Optional[list[int]] = None
+
+    @staticmethod
+    def _file_stamp(source: Path) -> Optional[list[int]]:
+        if not source.exists():
+            return None
+        stat = source.stat()
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def load(self, source: Path, lines: list[str]) -> None:
+        """Load the index, rebuilding it if it does not match the source file.
+
+        Args:
+            source: File the index describes
+            lines: Current lines of the source file
+        """
+        stamp = self._file_stamp(source)
+        if self._stamp is not None and self._stamp == stamp:
+            return
+        try:
+            data = json.loads(self.path.read_text())
+            if data.get("stamp") == stamp:
+                self.signatures = {k: frozenset(v) for k, v in data["terms"].items()}
+                self._stamp = stamp
+                return
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        self.signatures = {line_key(line): fact_terms(line) for line in lines if is_fact(line)}
+        self.save(source)
+
+    def save(self, source: Path) -> None:
+        """Persist the index, stamped with the source file's mtime and size."""
+        self._stamp = self._file_stamp(source)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        terms = {k: sorted(v) for k, v in self.signatures.items()}
+        self.path.write_text(json.dumps({"stamp": self._stamp, "terms": terms}))
+
+    def find(self, signature: frozenset[str]) -> Optional[str]:
+        """Key of the most similar near-duplicate of a word set, if any."""
+        best, best_score = None, self.threshold
+        for key, other in self.signatures.items():
+            score = similarity(signature, other)
+            if score >= best_score:
+                best, best_score = key, score
+        return best
+
+    def add(self, line: str) -> None:
+        self.signatures[line_key(line)] = fact_terms(line)
+
+    def remove(self, key: str) -> None:
+        self.signatures.pop(key, None)
+
+
+def dedup_lines(lines: list[str], threshold: float = DEFAULT_THRESHOLD) -> tuple[list[str], int]:
+    """Collapse near-duplicate fact lines.
+
+    Each group of near-duplicates keeps the position of its first line and
+    the wording of its last, so a restated fact replaces the older one.
+
+    Args:
+        lines: Lines of a semantic memory file
+        threshold: Word sets at least this similar are near-duplicates
+
+    Returns:
+        Compacted lines and number of lines removed
+    """
+    kept: list[str] = []
+    groups: list[tuple[frozenset[str], int]] = []  # (word set, position in kept)
+    removed = 0
+    for line in lines:
+        terms = fact_terms(line) if is_fact(line) else frozenset()
+        match = next(
+            (pos for other, pos in groups if similarity(terms, other) >= threshold),
+            None,
+        )
+        if match is None:
+            if terms:
+                groups.append((terms, len(kept)))
+            kept.append(line)
+        else:
+            kept[match] = line
+            removed += 1
+    return kept, removed
@@ -0,0 +1,142 @@
+"""Shared HTTP connection pool for LLM calls.
+
+One async HTTP client per process, with tuned keep-alive and connection
+limits, is shared by every chat model built through `agent.llm`. This
+lets orchestrators reuse warm connections instead of each paying DNS,
+TCP and TLS setup. HTTP/2 is negotiated when the `h2` package is
+installed and the endpoint supports it.
+"""
+
+import asyncio
+import importlib.util
+import os
+import time
+from typing import Any, Optional
+import httpx
+import structlog
+
+import config
+
+logger = structlog.get_logger(__name__)
+
+
+class LLMHTTPClient:
+    """Lazily built, process-wide httpx.AsyncClient with reuse statistics."""
+
+    def __init__(
+        self,
+        max_connections: Optional[int] = None,
+        max_keepalive: Optional[int] = None,
+        keepalive_s: Optional[float] = None,
+        timeout_s: Optional[float] = None,
+        http2: Optional[bool] = None,
+    ):
+        """Initialize shared client settings.
+
+        Args:
+            max_connections: Maximum open connections (from config.py)
+            max_keepalive: Maximum idle connections kept open (from config.py)
+            keepalive_s: Seconds an idle connection is kept (from config.py)
+            timeout_s: Request timeout in seconds (from config.py)
+            http2: Negotiate HTTP/2 (default: when `h2` is installed)
+        """
+        self.max_connections = max_connections or config.LLM_HTTP_MAX_CONNECTIONS
+        self.max_keepalive = max_keepalive or config.LLM_HTTP_MAX_KEEPALIVE
+        self.keepalive_s = keepalive_s or config.LLM_HTTP_KEEPALIVE_S
+        self.timeout_s = timeout_s or config.LLM_HTTP_TIMEOUT_S
+        if http2 is None:
+            http2 = config.LLM_HTTP2 and importlib.util.find_spec("h2") is not None
+        self.http2 = http2
+        self._client: Optional[httpx.AsyncClient] = None
+        self.stats = {
+            "requests": 0,
+            "connections_opened": 0,
+            "tls_handshakes": 0,
+            "warm_up_ms": None,
+        }
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared client (built on first use)."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=self.keepalive_s,
+                ),
+                timeout=httpx.Timeout(self.timeout_s, connect=10.0),
+                event_hooks={"request": [self._on_request]},
+            )
+            logger.info(
+                "Created LLM HTTP client",
+                http2=self.http2,
+                max_connections=self.max_connections,
+                keepalive_s=self.keepalive_s,
+            )
+        return self._client
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        """Count the request and attach a connection tracer."""
+        self.stats["requests"] += 1
+        request.extensions["trace"] = self._trace
+
+    async def _trace(self, event: str, info: dict[str, Any]) -> None:
+        """Count connection setups reported by the transport."""
+        if event in ("connection.connect_tcp.complete", "connection.connect_unix_socket.complete"):
+            self.stats["connections_opened"] += 1
+        elif event == "connection.start_tls.complete":
+            self.stats["tls_handshakes"] += 1
+
+    async def warm_up(self, base_url: Optional[str] = None, connections: int = 1) -> None:
+        """Open connections to the LLM endpoint ahead of the first turn.
+
+        Best effort: any HTTP response means the connection is established
+        and pooled; failures are logged and ignored.
+
+        Args:
+            base_url: OpenAI-compatible base URL (from .env if not provided)
+            connections: Number of connections to open concurrently
+        """
+        base_url = (base_url or os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1").rstrip("/")
+        headers = {"Authorization": f"Bearer {os.getenv('OPENAI_API_KEY', '')}"}
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(self.client.get(f"{base_url}/models", headers=headers) for _ in range(connections)),
+            return_exceptions=True,
+        )
+        self.stats["warm_up_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        errors = [str(r) for r in results if isinstance(r, Exception)]
+        if errors:
+            logger.warning("LLM connection warm-up failed", base_url=base_url, error=errors[0])
+        else:
+            logger.info("Warmed up LLM connections", base_url=base_url, ms=self.stats["warm_up_ms"])
+
+    def metrics(self) -> dict[str, Any]:
+        """Request, connection and reuse counters."""
+        requests = self.stats["requests"]
+        reused = max(0, requests - self.stats["connections_opened"])
+        return {
+            **self.stats,
+            "reused": reused,
+            "reuse_rate": round(reused / requests, 3) if requests else 0.0,
+            "http2": self.http2,
+        }
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+_pool: Optional[LLMHTTPClient] = None
+
+
+def get_http_pool() -> LLMHTTPClient:
+    """Get the process-wide LLM HTTP client."""
+    global _pool
+    if _pool is None:
+        _pool = LLMHTTPClient()
+    return _pool
@@ -3,6 +3,10 @@
 Provides OpenTelemetry-based tracing for the Amy agent.
 """
 
+import json
+import time
+from contextvars import ContextVar
+from pathlib import Path
 from typing import Optional, Any, Dict
 from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.messages import BaseMessage
@@ -80,6 +84,123 @@ class AmyCallbackHandler(BaseCallbackHandler):
         })
 
 
+# Records of the turn being traced in this context
+_current_turn: ContextVar[Optional[Dict[str, Any]]] = ContextVar("amy_trace_turn", default=None)
+
+
+class TraceRecorder(BaseCallbackHandler):
+    """Records LLM responses and tool I/O per turn into a JSONL trace file.
+
+    Each line is one record: a "turn" header with the user message, then
+    the turn's "llm" and "tool" records in order; records of fan-out
+    children carry a "subagent" key with the child's prompt. The file can
+    be served back with `agent.replay.ReplayChatModel`. The turn being recorded is
+    held in a context variable, so concurrent turns sharing a recorder
+    keep their records apart and each turn is written as one block.
+    """
+
+    def __init__(self, path: str, subagent: Optional[str] = None):
+        """Initialize trace recorder.
+
+        Args:
+            path: Trace file to append to
+            subagent: Prompt of the fan-out child this recorder is for;
+                its records are tagged with it
+        """
+        super().__init__()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.subagent = subagent
+
+    def for_subagent(self, prompt: str) -> "TraceRecorder":
+        """Recorder for a fan-out child, recording into the current turn.
+
+        Args:
+            prompt: The child's prompt
+
+        Returns:
+            Recorder tagging its records with the prompt
+        """
+        return TraceRecorder(str(self.path), subagent=prompt)
+
+    def _append(self, turn: Dict[str, Any], record: Dict[str, Any]) -> None:
+        if self.subagent is not None:
+            record["subagent"] = self.subagent
+        turn["records"].append(record)
+
+    def start_turn(self, message: str) -> Any:
+        """Begin recording a turn in the current context.
+
+        Args:
+            message: User message for the turn
+
+        Returns:
+            Token to pass to end_turn
+        """
+        return _current_turn.set({
+            "records": [{"type": "turn", "message": message}],
+            "tools": {},
+            "start": time.perf_counter(),
+        })
+
+    def end_turn(self, token: Any) -> None:
+        """Write the turn started with `token` to the trace file.
+
+        Args:
+            token: Token returned by start_turn
+        """
+        turn = _current_turn.get()
+        _current_turn.reset(token)
+        if turn is None:
+            return
+        records = turn["records"]
+        records[0]["duration_ms"] = round((time.perf_counter() - turn["start"]) * 1000, 1)
+        with self.path.open("a") as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+
+    def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        """Record the model's message."""
+        turn = _current_turn.get()
+        if turn is None:
+            return
+        message = response.generations[0][0].message
+        self._append(turn, {
+            "type": "llm",
+            "content": message.content,
+            "tool_calls": [
+                {"name": c["name"], "args": c["args"], "id": c.get("id")}
+                for c in getattr(message, "tool_calls", None) or []
+            ],
+            "usage": getattr(message, "usage_metadata", None),
+        })
+
+    def on_tool_start(
+        self,
+        serialized: Dict[str, Any],
+        input_str: str,
+        **kwargs: Any,
+    ) -> None:
+        """Remember tool input until the tool finishes."""
+        turn = _current_turn.get()
+        if turn is None:
+            return
+        turn["tools"][kwargs.get("run_id")] = {
+            "type": "tool",
+            "name": serialized.get("name", "unknown"),
+            "input": input_str,
+        }
+
+    def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        """Record tool input and output."""
+        turn = _current_turn.get()
+        if turn is None:
+            return
+        record = turn["tools"].pop(kwargs.get("run_id"), {"type": "tool", "name": "unknown"})
+        record["output"] = str(getattr(output, "content", output))
+        self._append(turn, record)
+
+
 def get_agentlightning_handler():
     """Get Agent Lightning handler if available.
 
@@ -0,0 +1,130 @@
+"""LLM client construction.
+
+A single place to build chat models so that callers serving many
+sessions can create one client and share it. All models route their
+calls through the process-wide scheduler in `agent.scheduler` and share
+the connection pool in `agent.http_client`.
+"""
+
+import os
+from typing import Any, AsyncIterator, List, Optional
+import httpx
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+from langchain_openai import ChatOpenAI
+
+import config
+from .http_client import get_http_pool
+from .scheduler import INTERACTIVE, get_scheduler
+
+
+def estimate_tokens(messages: List[BaseMessage], max_tokens: Optional[int]) -> int:
+    """Rough token cost of a call (prompt at 4 characters per token plus output).
+
+    Args:
+        messages: Prompt messages
+        max_tokens: Output token limit
+
+    Returns:
+        Estimated tokens
+    """
+    prompt = sum(len(str(m.content)) for m in messages) // 4
+    return prompt + (max_tokens or 0)
+
+
+def usage_tokens(message: Any) -> Optional[int]:
+    """Total tokens reported for a message (None if the API sent no usage)."""
+    usage = getattr(message, "usage_metadata", None)
+    return usage.get("total_tokens") if usage else None
+
+
+class ScheduledChatOpenAI(ChatOpenAI):
+    """ChatOpenAI whose calls go through the shared LLM scheduler."""
+
+    priority: int = INTERACTIVE
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        generate = super()._agenerate
+        scheduler = get_scheduler()
+        estimate = estimate_tokens(messages, self.max_tokens)
+        result = await scheduler.submit(
+            lambda: generate(messages, stop=stop, run_manager=run_manager, **kwargs),
+            priority=self.priority,
+            tokens=estimate,
+        )
+        usages = [usage_tokens(generation.message) for generation in result.generations]
+        scheduler.settle(estimate, None if None in usages else sum(usages))
+        return result
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        stream = super()._astream
+        scheduler = get_scheduler()
+        estimate = estimate_tokens(messages, self.max_tokens)
+        reported: Optional[int] = None
+        chunks = 0
+        try:
+            async for chunk in scheduler.stream(
+                lambda: stream(messages, stop=stop, run_manager=run_manager, **kwargs),
+                priority=self.priority,
+                tokens=estimate,
+            ):
+                chunks += 1
+                usage = usage_tokens(chunk.message)
+                if usage is not None:
+                    reported = (reported or 0) + usage
+                yield chunk
+        finally:
+            # Without reported usage, count about one token per chunk
+            used = reported if reported is not None else estimate_tokens(messages, 0) + chunks
+            scheduler.settle(estimate, used)
+
+
+def create_chat_model(
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    model: Optional[str] = None,
+    max_tokens: Optional[int] = None,
+    temperature: Optional[float] = None,
+    priority: int = INTERACTIVE,
+    http_client: Optional[httpx.AsyncClient] = None,
+) -> ChatOpenAI:
+    """Create a chat model for an OpenAI-compatible API.
+
+    Args:
+        api_key: API key (from .env if not provided)
+        base_url: Base URL for OpenAI-compatible API (from .env if not provided)
+        model: Model name (from config.py)
+        max_tokens: Max tokens (from config.py)
+        temperature: Temperature (from config.py)
+        priority: Scheduler priority class (INTERACTIVE or BATCH)
+        http_client: Async HTTP client (default: the shared pool)
+
+    Returns:
+        Configured chat model
+    """
+    return ScheduledChatOpenAI(
+        api_key=api_key or os.getenv("OPENAI_API_KEY", ""),
+        base_url=base_url or os.getenv("OPENAI_BASE_URL", ""),
+        model=model or config.LLM_MODEL,
+        max_tokens=max_tokens or config.LLM_MAX_TOKENS,
+        temperature=temperature if temperature is not None else config.LLM_TEMPERATURE,
+        # Retries are handled by the scheduler
+        max_retries=0,
+        # Agents stream internally; without this, custom base URLs and
+        # clients leave streamed replies without token usage
+        stream_usage=True,
+        priority=priority,
+        http_async_client=http_client or get_http_pool().client,
+    )
@@ -3,14 +3,24 @@
 Manages semantic and episodic memory stored in markdown files.
 """
 
+import json
 import os
-from datetime import datetime, date
+import re
+import zipfile
+from collections import OrderedDict
+from datetime import datetime, date, timedelta
 from pathlib import Path
 from typing import Optional
 import structlog
 
+from .dedup import DEFAULT_THRESHOLD, SignatureIndex, dedup_lines, fact_terms, is_fact, line_key
+from .watcher import DELETED, OVERFLOW, FileWatcher, is_under
+
 logger = structlog.get_logger(__name__)
 
+# Turn header written by add_conversation_turn: "### [<iso timestamp>] ROLE"
+TURN_HEADER_RE = re.compile(rb"^### \[(\d{4}-\d{2}-\d{2}T[\d:.]+)\] ([A-Z_]+)\n", re.MULTILINE)
+
 
 class MemorySystem:
     """Manages semantic and episodic memory for the agent."""
@@ -19,15 +29,33 @@ class MemorySystem:
         self,
         semantic_file: str = "memory/semantic_memory.md",
         episodic_dir: str = "memory/episodic",
+        archive_cache_days: int = 32,
+        dedup_threshold: float = DEFAULT_THRESHOLD,
+        watcher: Optional[FileWatcher] = None,
     ):
         """Initialize memory system.
 
         Args:
             semantic_file: Path to semantic memory markdown file
             episodic_dir: Directory for episodic memory files
+            archive_cache_days: Number of decompressed archived days to keep
+            dedup_threshold: Semantic facts whose stemmed content words have
+                at least this Jaccard similarity are treated as the same fact
+            watcher: Running file watcher; archived days it reports changed
+                are dropped from the cache
         """
         self.semantic_file = Path(semantic_file)
         self.episodic_dir = Path(episodic_dir)
+        self.archive_dir = self.episodic_dir / "archive"
+        self.archive_cache_days = archive_cache_days
+        # LRU of archived days: date -> (content bytes, turn index entries)
+        self._archive_cache: OrderedDict[date, tuple[bytes, list[dict]]] = OrderedDict()
+        self.watcher = watcher
+        self._watch_seq = watcher.seq if watcher is not None else 0
+        self.dedup_threshold = dedup_threshold
+        self.semantic_index = SignatureIndex(
+            self.semantic_file.with_suffix(".sigs.json"), threshold=dedup_threshold
+        )
 
         # Ensure directories exist
         self.episodic_dir.mkdir(parents=True, exist_ok=True)
@@ -91,16 +119,86 @@ This file stores general knowledge and facts about the user.
     def write_semantic_memory(self, content: str, append: bool = True) -> None:
         """Write to semantic memory.
 
+        When appending, facts that near-duplicate an existing fact replace
+        it in place instead of being appended again.
+
         Args:
             content: Content to write
             append: If True, append to existing content
         """
         if append and self.semantic_file.exists():
-            existing = self.semantic_file.read_text()
-            content = f"{existing}\n\n{content}"
+            lines = self.semantic_file.read_text().split("\n")
+            new_lines, merged = self._merge_semantic_facts(lines, content.split("\n"))
+            if merged and not any(is_fact(line) for line in new_lines):
+                # Every fact was already known; don't append orphan headings
+                content = "\n".join(lines)
+            else:
+                content = "\n".join(lines) + "\n\n" + "\n".join(new_lines)
+            self.semantic_file.write_text(content)
+            self.semantic_index.save(self.semantic_file)
+            logger.info("Updated semantic memory", path=str(self.semantic_file), merged=merged)
+            return
+
         self.semantic_file.write_text(content)
+        self.semantic_index.load(self.semantic_file, content.split("\n"))
         logger.info("Updated semantic memory", path=str(self.semantic_file))
 
+    def _merge_semantic_facts(self, lines: list[str], new_lines: list[str]) -> tuple[list[str], int]:
+        """Fold near-duplicate new facts into existing lines.
+
+        Args:
+            lines: Existing file lines (updated in place)
+            new_lines: Lines being appended
+
+        Returns:
+            Lines still to append and number of facts merged
+        """
+        self.semantic_index.load(self.semantic_file, lines)
+        pending: list[str] = []
+        merged = 0
+        for line in new_lines:
+            if not is_fact(line):
+                pending.append(line)
+                continue
+            key = self.semantic_index.find(fact_terms(line))
+            if key is None:
+                pending.append(line)
+                self.semantic_index.add(line)
+                continue
+
+            # Newer wording wins, at the position of the older fact
+            merged += 1
+            for target in (lines, pending):
+                pos = next(
+                    (i for i, existing in enumerate(target)
+                     if is_fact(existing) and line_key(existing) == key),
+                    None,
+                )
+                if pos is not None:
+                    target[pos] = line
+                    break
+            self.semantic_index.remove(key)
+            self.semantic_index.add(line)
+        return pending, merged
+
+    def compact_semantic_memory(self) -> int:
+        """Collapse near-duplicate facts already in semantic memory.
+
+        Returns:
+            Number of lines removed
+        """
+        if not self.semantic_file.exists():
+            return 0
+        lines, removed = dedup_lines(self.semantic_file.read_text().split("\n"), self.dedup_threshold)
+        if removed:
+            # Drop the blank runs left behind by removed blocks
+            content = re.sub(r"\n{3,}", "\n\n", "\n".join(lines))
+            self.semantic_file.write_text(content)
+            lines = content.split("\n")
+        self.semantic_index.load(self.semantic_file, lines)
+        logger.info("Compacted semantic memory", path=str(self.semantic_file), removed=removed)
+        return removed
+
     def read_episodic_memory(self, d: Optional[date] = None) -> str:
         """Read episodic memory for a specific day.
 
@@ -113,7 +211,8 @@ This file stores general knowledge and facts about the user.
         filename = self._get_episodic_filename(d)
         filepath = self.episodic_dir / filename
         if not filepath.exists():
-            return ""
+            archived = self._read_archived_day(d or date.today())
+            return archived[0].decode() if archived else ""
         return filepath.read_text()
 
     def write_episodic_memory(
@@ -129,16 +228,16 @@ This file stores general knowledge and facts about the user.
         filename = self._get_episodic_filename(d)
         filepath = self.episodic_dir / filename
 
-        if append and filepath.exists():
-            existing = filepath.read_text()
-            content = f"{existing}\n\n{content}"
-
         # Add header if new file
         if not filepath.exists():
             header = f"# {d.isoformat() if d else date.today().isoformat()}\n\n"
-            content = header + content
-
-        filepath.write_text(content)
+            filepath.write_text(header + content)
+        elif append:
+            # Append in place instead of rewriting the whole day
+            with filepath.open("ab") as f:
+                f.write(f"\n\n{content}".encode())
+        else:
+            filepath.write_text(content)
         logger.info("Updated episodic memory", path=str(filepath))
 
     def get_recent_episodic_memories(
@@ -201,6 +300,287 @@ This file stores general knowledge and facts about the user.
             role: Role (user/assistant)
             content: Message content
         """
-        timestamp = datetime.now().isoformat()
-        entry = f"### [{timestamp}] {role.upper()}\n\n{content}"
-        self.write_episodic_memory(entry, append=True)
+        now = datetime.now()
+        entry = f"### [{now.isoformat()}] {role.upper()}\n\n{content}"
+        self.write_episodic_memory(entry, d=now.date(), append=True)
+        self._sync_turn_index(now.date())
+
+    def _get_index_path(self, d: date) -> Path:
+        """Get the sidecar turn index path for a day."""
+        return self.episodic_dir / f"{d.isoformat()}.idx"
+
+    def _scan_turns(self, filepath: Path, start: int) -> list[dict]:
+        """Find turns in a day file from a byte offset onwards.
+
+        Args:
+            filepath: Episodic day file
+            start: Byte offset to scan from
+
+        Returns:
+            Index entries ({"ts", "role", "offset", "length"})
+        """
+        with filepath.open("rb") as f:
+            f.seek(start)
+            return self._parse_turns(f.read(), start)
+
+    def _parse_turns(self, data: bytes, start: int = 0) -> list[dict]:
+        """Find turns in a chunk of a day file.
+
+        Args:
+            data: Bytes of the day file starting at `start`
+            start: Byte offset of `data` within the file
+
+        Returns:
+            Index entries ({"ts", "role", "offset", "length"})
+        """
+        matches = list(TURN_HEADER_RE.finditer(data))
+        entries = []
+        for i, match in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(data)
+            body = data[match.start():end].rstrip(b"\n")
+            entries.append({
+                "ts": match.group(1).decode(),
+                "role": match.group(2).decode(),
+                "offset": start + match.start(),
+                "length": len(body),
+            })
+        return entries
+
+    def _sync_turn_index(self, d: date) -> list[dict]:
+        """Bring a day's turn index up to date and return it.
+
+        Only bytes appended since the last sync are scanned. The index is
+        rebuilt if the day file was rewritten underneath it.
+
+        Args:
+            d: Day to index
+
+        Returns:
+            Index entries in file order
+        """
+        filepath = self.episodic_dir / self._get_episodic_filename(d)
+        index_path = self._get_index_path(d)
+        if not filepath.exists():
+            archived = self._read_archived_day(d)
+            return archived[1] if archived else []
+
+        entries = []
+        if index_path.exists():
+            entries = [json.loads(line) for line in index_path.read_text().splitlines() if line]
+
+        size = filepath.stat().st_size
+        end = entries[-1]["offset"] + entries[-1]["length"] if entries else 0
+        if entries and (end > size or not self._is_turn_start(filepath, entries[-1]["offset"])):
+            entries, end = [], 0
+            index_path.unlink()
+
+        if end < size:
+            new_entries = [e for e in self._scan_turns(filepath, end) if e["offset"] >= end]
+            if new_entries:
+                with index_path.open("a") as f:
+                    for entry in new_entries:
+                        f.write(json.dumps(entry) + "\n")
+                entries.extend(new_entries)
+        return entries
+
+    def _is_turn_start(self, filepath: Path, offset: int) -> bool:
+        """Check that a turn header still starts at an indexed offset."""
+        with filepath.open("rb") as f:
+            f.seek(offset)
+            return f.read(5) == b"### ["
+
+    def _read_turns(self, d: date, entries: list[dict]) -> list[dict]:
+        """Read indexed turns with seek-and-read.
+
+        Args:
+            d: Day the entries belong to
+            entries: Index entries to read
+
+        Returns:
+            Turns as {"timestamp", "role", "content"}
+        """
+        if not entries:
+            return []
+        filepath = self.episodic_dir / self._get_episodic_filename(d)
+        raws = []
+        if filepath.exists():
+            with filepath.open("rb") as f:
+                for entry in entries:
+                    f.seek(entry["offset"])
+                    raws.append(f.read(entry["length"]))
+        else:
+            archived = self._read_archived_day(d)
+            data = archived[0] if archived else b""
+            raws = [data[e["offset"]:e["offset"] + e["length"]] for e in entries]
+
+        turns = []
+        for entry, raw in zip(entries, raws):
+            _, _, content = raw.decode().partition("\n\n")
+            turns.append({
+                "timestamp": entry["ts"],
+                "role": entry["role"].lower(),
+                "content": content,
+            })
+        return turns
+
+    def _get_bundle_path(self, d: date) -> Path:
+        """Get the monthly archive bundle holding a day."""
+        return self.archive_dir / f"{d.year:04d}-{d.month:02d}.zip"
+
+    def _read_archived_day(self, d: date) -> Optional[tuple[bytes, list[dict]]]:
+        """Read an archived day through the LRU cache.
+
+        Args:
+            d: Day to read
+
+        Returns:
+            Tuple of (day file bytes, turn index entries) or None if not archived
+        """
+        self._drop_changed_archives()
+        cached = self._archive_cache.get(d)
+        if cached is not None:
+            self._archive_cache.move_to_end(d)
+            return cached
+
+        bundle = self._get_bundle_path(d)
+        if not bundle.exists():
+            return None
+        name = self._get_episodic_filename(d)
+        with zipfile.ZipFile(bundle) as zf:
+            try:
+                data = zf.read(name)
+            except KeyError:
+                return None
+
+        day = (data, self._parse_turns(data))
+        self._archive_cache[d] = day
+        if len(self._archive_cache) > self.archive_cache_days:
+            self._archive_cache.popitem(last=False)
+        return day
+
+    def _drop_changed_archives(self) -> None:
+        """Evict cached archived days whose bundle changed outside this process."""
+        if self.watcher is None or not self.watcher.running:
+            return
+        seq = self.watcher.seq
+        changes = self.watcher.changes_since(self._watch_seq)
+        self._watch_seq = seq
+        archive_dir = os.path.abspath(self.archive_dir)
+        if changes is None or any(
+            c.kind in (DELETED, OVERFLOW) and is_under(archive_dir, c.path) for c in changes
+        ):
+            self._archive_cache.clear()
+            return
+        months = {Path(c.path).stem for c in changes if is_under(c.path, archive_dir)}
+        for d in [d for d in self._archive_cache if f"{d.year:04d}-{d.month:02d}" in months]:
+            del self._archive_cache[d]
+
+    def archive_episodic_memory(self, older_than_days: int) -> int:
+        """Move old episodic days into compressed monthly archives.
+
+        Each month is one zip bundle; its central directory serves as the
+        index of archived days. Archived days stay readable through
+        read_episodic_memory, search_memory and the turn APIs.
+
+        Args:
+            older_than_days: Archive days older than this many days
+
+        Returns:
+            Number of days archived
+        """
+        cutoff = date.today() - timedelta(days=older_than_days)
+        by_bundle: dict[Path, list[tuple[date, Path]]] = {}
+        for filepath in self.episodic_dir.glob("*.md"):
+            try:
+                d = date.fromisoformat(filepath.stem)
+            except ValueError:
+                continue
+            if d < cutoff:
+                by_bundle.setdefault(self._get_bundle_path(d), []).append((d, filepath))
+
+        archived = 0
+        for bundle, days in by_bundle.items():
+            bundle.parent.mkdir(parents=True, exist_ok=True)
+            members = {}
+            if bundle.exists():
+                with zipfile.ZipFile(bundle) as zf:
+                    members = {n: zf.read(n) for n in zf.namelist()}
+
+            for d, filepath in days:
+                data = filepath.read_bytes()
+                name = filepath.name
+                if name in members:
+                    # Day was written again after it was archived: keep both parts
+                    data = members[name] + b"\n\n" + data.split(b"\n\n", 1)[-1]
+                members[name] = data
+                self._archive_cache.pop(d, None)
+
+            # Write the bundle to a temp file first so a crash cannot lose days
+            tmp = bundle.with_suffix(".tmp")
+            with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                for name in sorted(members):
+                    zf.writestr(name, members[name])
+            os.replace(tmp, bundle)
+
+            for d, filepath in days:
+                filepath.unlink()
+                self._get_index_path(d).unlink(missing_ok=True)
+                archived += 1
+
+        if archived:
+            logger.info("Archived episodic memory", days=archived, before=cutoff.isoformat())
+        return archived
+
+    def get_turns(
+        self,
+        start: datetime,
+        end: datetime,
+        role: Optional[str] = None,
+    ) -> list[dict]:
+        """Get conversation turns in a time range.
+
+        Args:
+            start: Range start (inclusive)
+            end: Range end (inclusive)
+            role: Only return turns from this role (user/assistant)
+
+        Returns:
+            Turns as {"timestamp", "role", "content"}, oldest first
+        """
+        turns = []
+        d = start.date()
+        while d <= end.date():
+            selected = [
+                e for e in self._sync_turn_index(d)
+                if start <= datetime.fromisoformat(e["ts"]) <= end
+                and (role is None or e["role"] == role.upper())
+            ]
+            turns.extend(self._read_turns(d, selected))
+            d += timedelta(days=1)
+        return turns
+
+    def get_last_turns(
+        self, n: int, role: Optional[str] = None, days: int = 7
+    ) -> list[dict]:
+        """Get the most recent conversation turns.
+
+        Args:
+            n: Number of turns to return
+            role: Only return turns from this role (user/assistant)
+            days: Number of days to look back
+
+        Returns:
+            Turns as {"timestamp", "role", "content"}, oldest first
+        """
+        turns: list[dict] = []
+        today = date.today()
+        for i in range(days):
+            if len(turns) >= n:
+                break
+            d = today - timedelta(days=i)
+            entries = [
+                e for e in self._sync_turn_index(d)
+                if role is None or e["role"] == role.upper()
+            ]
+            turns = self._read_turns(d, entries[-(n - len(turns)):]) + turns
+        return turns
@@ -1,20 +1,40 @@
 """Orchestrator Agent - Main agent for task handling."""
 
+import asyncio
+import time
 from typing import Optional, List, Any
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import BaseMessage, HumanMessage
+import httpx
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, SystemMessage
 from langchain_core.tools import BaseTool
+from langgraph.errors import GraphRecursionError
 from langgraph.prebuilt import create_react_agent
-import os
 import structlog
 
 import config
+from .budget import (
+    BudgetCallbackHandler,
+    BudgetExceeded,
+    TurnBudget,
+    reset_current_budget,
+    set_current_budget,
+)
+from .instrumentation import TraceRecorder
+from .consolidation import ConsolidationWorker
+from .llm import create_chat_model
 from .memory import MemorySystem
-from .tools import FileTool, SearchTool
+from .router import FAST, STRONG, ModelRouter
+from .scheduler import BATCH
+from .tools import FileTool, ResultStoreTool, SearchTool, ToolMemo, ToolSelector, bind_tool
 from .skills import SummarizeSkill
+from .subagents import FanOutResult, FanOutTool, SubagentExecutor, SubagentTask
+from .watcher import workspace_watcher
 
 logger = structlog.get_logger(__name__)
 
+# Tools that change files in the workspace
+WRITE_TOOLS = {"write_file", "create_directory"}
+
 
 class Orchestrator:
     """Main orchestrator agent that coordinates tools and memory."""
@@ -26,6 +46,16 @@ class Orchestrator:
         model: Optional[str] = None,
         max_tokens: Optional[int] = None,
         temperature: Optional[float] = None,
+        llm: Optional[BaseChatModel] = None,
+        tools: Optional[List[BaseTool]] = None,
+        memory: Optional[MemorySystem] = None,
+        fast_llm: Optional[BaseChatModel] = None,
+        system_prompt: Optional[str] = None,
+        record_trace: Optional[str] = None,
+        replay_trace: Optional[str] = None,
+        http_client: Optional[httpx.AsyncClient] = None,
+        consolidate: Optional[bool] = None,
+        read_only: bool = False,
     ):
         """Initialize orchestrator.
 
@@ -35,31 +65,105 @@ class Orchestrator:
             model: Model name (from config.py)
             max_tokens: Max tokens (from config.py)
             temperature: Temperature (from config.py)
+            llm: Shared chat model (built from the settings above if not provided)
+            tools: Tools to offer (this orchestrator's tools if not provided)
+            memory: Memory system (from config.py paths if not provided)
+            fast_llm: Shared fast chat model for routed turns (built from
+                config.LLM_FAST_MODEL when routing is enabled)
+            system_prompt: Base system prompt (from config.py)
+            record_trace: Append each turn's LLM responses and tool I/O to
+                this trace file
+            replay_trace: Serve LLM responses from this trace file instead
+                of calling a model
+            http_client: Async HTTP client for LLM calls (default: the
+                process-wide pool)
+            consolidate: Extract semantic facts from new turns in the
+                background (from config.py; never when replaying)
+            read_only: Offer no tools that change files (e.g. for
+                evaluation runs against the real workspace)
         """
-        self.memory = MemorySystem(
+        # Watches the workspace so caches skip re-walks (None when disabled)
+        self.watcher = workspace_watcher()
+
+        self.memory = memory or MemorySystem(
             semantic_file=config.MEMORY_SEMANTIC_FILE,
             episodic_dir=config.MEMORY_EPISODIC_DIR,
+            watcher=self.watcher,
         )
 
         # Initialize tools
-        self.file_tool = FileTool()
-        self.search_tool = SearchTool()
+        # Read-only tool results are memoized per turn
+        self.tool_memo = ToolMemo(watcher=self.watcher) if config.TOOL_MEMO_ENABLED else None
+        self.file_tool = FileTool(memo=self.tool_memo)
+        self.search_tool = SearchTool(watcher=self.watcher, memo=self.tool_memo)
+        self.result_tool = ResultStoreTool()
         self.summarize_skill = SummarizeSkill()
-
-        # Initialize LLM
-        self.llm = ChatOpenAI(
-            api_key=api_key or os.getenv("OPENAI_API_KEY", ""),
-            base_url=base_url or os.getenv("OPENAI_BASE_URL", ""),
-            model=model or config.LLM_MODEL,
-            max_tokens=max_tokens or config.LLM_MAX_TOKENS,
-            temperature=temperature or config.LLM_TEMPERATURE,
+        self.fan_out_tool = FanOutTool(self.fan_out)
+
+        # Initialize LLM (recorded responses when replaying)
+        subagent_llm = None
+        if replay_trace:
+            from .replay import ReplayChatModel, SubagentReplayChatModel
+
+            llm = ReplayChatModel.from_trace(replay_trace)
+            subagent_llm = SubagentReplayChatModel.from_trace(replay_trace)
+        self.llm = llm or create_chat_model(
+            api_key=api_key,
+            base_url=base_url,
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            http_client=http_client,
         )
 
+        # Fast model for simple turns
+        self.fast_llm = fast_llm
+        if self.fast_llm is None and config.LLM_ROUTING_ENABLED and not replay_trace:
+            self.fast_llm = create_chat_model(
+                api_key=api_key,
+                base_url=base_url,
+                model=config.LLM_FAST_MODEL,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                http_client=http_client,
+            )
+        self.router = ModelRouter() if self.fast_llm is not None else None
+        self.recorder = TraceRecorder(record_trace) if record_trace else None
+        self._budgets: set[TurnBudget] = set()
+
+        # Background memory consolidation at batch priority
+        if consolidate is None:
+            consolidate = config.CONSOLIDATION_ENABLED
+        self.consolidator = None
+        if consolidate and not replay_trace:
+            self.consolidator = ConsolidationWorker(
+                self.memory,
+                create_chat_model(
+                    api_key=api_key,
+                    base_url=base_url,
+                    model=config.LLM_FAST_MODEL or model,
+                    temperature=0.0,
+                    priority=BATCH,
+                    http_client=http_client,
+                ),
+            )
+
         # Build tools list
-        self.tools = self._build_tools()
+        self.read_only = read_only
+        self.tools = tools if tools is not None else self._build_tools()
+        self.tool_selector = (
+            ToolSelector(self.tools) if config.TOOL_SELECTION_ENABLED else None
+        )
 
-        # Create agent
-        self.agent = self._create_agent()
+        # Create agent (full tool set); per-subset agents are built on demand
+        self.base_prompt = system_prompt
+        self._prompt_stamp = self._semantic_stamp()
+        self.system_prompt = self._build_system_prompt(system_prompt)
+        self._agents: dict[tuple, Any] = {}
+        self.agent = self._get_agent(self.tools)
+        self.subagents = SubagentExecutor(
+            subagent_llm or self.llm, self.tools, recorder=self.recorder
+        )
 
         logger.info("Orchestrator initialized")
 
@@ -67,29 +171,35 @@ class Orchestrator:
         """Build list of available tools.
 
         Returns:
-            List of LangChain tools
+            Tools bound to this orchestrator's tool instances (without
+            WRITE_TOOLS when read-only)
         """
-        from langchain_core.tools import convert_to_openai_tool
-
         tools = [
-            self.file_tool.read_file,
-            self.file_tool.write_file,
-            self.file_tool.list_directory,
-            self.file_tool.create_directory,
-            self.search_tool.search_files,
-            self.search_tool.grep,
-            self.summarize_skill.summarize_text,
-            self.summarize_skill.extract_key_points,
+            bind_tool(self.file_tool, FileTool.read_file),
+            bind_tool(self.file_tool, FileTool.write_file),
+            bind_tool(self.file_tool, FileTool.list_directory),
+            bind_tool(self.file_tool, FileTool.create_directory),
+            bind_tool(self.search_tool, SearchTool.search_files),
+            bind_tool(self.search_tool, SearchTool.grep),
+            bind_tool(self.result_tool, ResultStoreTool.read_tool_result),
+            bind_tool(self.summarize_skill, SummarizeSkill.summarize_text),
+            bind_tool(self.summarize_skill, SummarizeSkill.extract_key_points),
+            bind_tool(self.fan_out_tool, FanOutTool.fan_out),
         ]
-        return [convert_to_openai_tool(t) for t in tools]
+        if self.read_only:
+            tools = [t for t in tools if t.name not in WRITE_TOOLS]
+        return tools
 
-    def _create_agent(self):
-        """Create the LangGraph ReAct agent.
+    def _build_system_prompt(self, base_prompt: Optional[str] = None) -> str:
+        """Build the system prompt with semantic memory.
+
+        Args:
+            base_prompt: Base system prompt (from config.py)
 
         Returns:
-            Compiled agent executor
+            System prompt
         """
-        system_prompt = config.AGENT_SYSTEM_PROMPT
+        system_prompt = base_prompt or config.AGENT_SYSTEM_PROMPT
 
         # Add memory context to system prompt
         semantic_memory = self.memory.read_semantic_memory()
@@ -100,7 +210,105 @@ class Orchestrator:
 
 {semantic_memory}
 """
-        return create_react_agent(self.llm, self.tools, prompt=system_prompt)
+        return system_prompt
+
+    def _semantic_stamp(self) -> Optional[tuple[int, int]]:
+        """Modification time and size of the semantic memory file."""
+        try:
+            st = self.memory.semantic_file.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _prompt(self, state: dict) -> List[BaseMessage]:
+        """Prepend the system prompt to the agent's messages.
+
+        The prompt is rebuilt when semantic memory has changed since it was
+        last built (e.g. after background consolidation), so new facts
+        reach the running agent on its next LLM call.
+
+        Args:
+            state: Agent state
+
+        Returns:
+            Messages for the model
+        """
+        stamp = self._semantic_stamp()
+        if stamp != self._prompt_stamp:
+            self.system_prompt = self._build_system_prompt(self.base_prompt)
+            self._prompt_stamp = stamp
+        return [SystemMessage(content=self.system_prompt)] + list(state["messages"])
+
+    def _create_agent(self, tools: Optional[List[BaseTool]] = None, tier: str = STRONG):
+        """Create the LangGraph ReAct agent.
+
+        Args:
+            tools: Tools to offer (default: all tools)
+            tier: Model tier to use (fast or strong)
+
+        Returns:
+            Compiled agent executor
+        """
+        tools = self.tools if tools is None else tools
+        llm = self.fast_llm if tier == FAST else self.llm
+        return create_react_agent(llm, tools, prompt=self._prompt)
+
+    def _get_agent(self, tools: List[BaseTool], tier: str = STRONG):
+        """Get the agent for a tool subset and tier, compiling it on first use.
+
+        Args:
+            tools: Tools to offer
+            tier: Model tier to use (fast or strong)
+
+        Returns:
+            Compiled agent executor
+        """
+        key = (tier,) + tuple(t.name for t in tools)
+        agent = self._agents.get(key)
+        if agent is None:
+            agent = self._create_agent(tools, tier)
+            self._agents[key] = agent
+        return agent
+
+    def _route(self, message: str) -> str:
+        """Pick the model tier for a turn.
+
+        Args:
+            message: User message
+
+        Returns:
+            Model tier (strong when routing is disabled)
+        """
+        if self.router is None:
+            return STRONG
+        return self.router.classify(message).tier
+
+    def _select_tools(
+        self,
+        message: str,
+        conversation_history: Optional[List[BaseMessage]] = None,
+    ) -> List[BaseTool]:
+        """Select the tools to offer for a turn.
+
+        Args:
+            message: User message
+            conversation_history: Previous conversation messages
+
+        Returns:
+            Tools (all tools when selection is disabled)
+        """
+        if self.tool_selector is None:
+            return self.tools
+
+        # Include the previous user message so follow-ups keep their tools
+        text = message
+        for msg in reversed(conversation_history or []):
+            role = msg.get("role") if isinstance(msg, dict) else getattr(msg, "type", "")
+            if role in ("user", "human"):
+                content = msg.get("content") if isinstance(msg, dict) else msg.content
+                text = f"{content}\n{message}"
+                break
+        return self.tool_selector.select(text)
 
     def _get_memory_context(self) -> str:
         """Get relevant memory context for current conversation.
@@ -122,11 +330,149 @@ class Orchestrator:
 
         return "\n\n".join(context_parts) if context_parts else ""
 
+    def _build_inputs(
+        self,
+        message: str,
+        conversation_history: Optional[List[BaseMessage]] = None,
+    ) -> dict:
+        """Build agent inputs from history and the new user message.
+
+        Args:
+            message: User message
+            conversation_history: Previous conversation messages
+
+        Returns:
+            Agent input state
+        """
+        history = list(conversation_history or [])
+        return {"messages": history + [HumanMessage(content=message)]}
+
+    async def fan_out(self, tasks: List[SubagentTask]) -> FanOutResult:
+        """Split work across isolated child agents running in parallel.
+
+        Each child starts from an empty context with only its own tools, so
+        wide tasks do not grow one long serial ReAct loop. Offered to the
+        model as the `fan_out` tool; children run under the current turn's
+        budget and their tokens count against it.
+
+        Args:
+            tasks: Work items, one child each
+
+        Returns:
+            Merged result with per-child token usage and latency
+        """
+        return await self.subagents.fan_out(tasks)
+
+    def _start_turn(self, message: str, budget: TurnBudget) -> dict:
+        """Prepare the run config for a turn.
+
+        Args:
+            message: User message
+            budget: Budget for the turn
+
+        Returns:
+            Run config with the step limit and callbacks attached
+        """
+        callbacks: List[Any] = [BudgetCallbackHandler(budget)]
+        if self.recorder is not None:
+            callbacks.append(self.recorder)
+        return {"callbacks": callbacks, "recursion_limit": budget.recursion_limit}
+
+    def cancel(self) -> None:
+        """Cancel every turn currently running on this orchestrator.
+
+        In-flight LLM streams are aborted and tools stop at their next
+        cancellation check; each turn returns what it has so far.
+        """
+        for budget in list(self._budgets):
+            budget.cancel()
+
+    async def aclose(self) -> None:
+        """Stop background work; unconsolidated turns are picked up next time."""
+        if self.consolidator is not None:
+            await self.consolidator.stop()
+
+    @staticmethod
+    def _stop_note(reason: str) -> str:
+        """Note appended to an answer cut short by a budget."""
+        return f"[Stopped early: {reason}. The answer above may be incomplete.]"
+
+    async def _invoke(self, agent: Any, inputs: dict, run_config: dict, budget: TurnBudget) -> dict:
+        """Invoke an agent within the turn budget.
+
+        Args:
+            agent: Compiled agent
+            inputs: Agent input state
+            run_config: Run config from _start_turn
+            budget: Budget for the turn
+
+        Returns:
+            Final agent state, or the latest partial state with a note and a
+            "stopped" reason if the budget ran out
+        """
+        latest = inputs
+        pending: list[str] = []  # Text streamed since the latest complete state
+
+        async def consume() -> None:
+            nonlocal latest
+            async for mode, data in agent.astream(
+                inputs, config=run_config, stream_mode=["values", "messages"]
+            ):
+                if mode == "values":
+                    latest = data
+                    pending.clear()
+                    budget.check()
+                else:
+                    chunk, _metadata = data
+                    if isinstance(chunk, AIMessageChunk) and isinstance(chunk.content, str):
+                        pending.append(chunk.content)
+
+        task = asyncio.ensure_future(consume())
+        cancelled = budget.cancelled_future()
+        try:
+            await asyncio.wait(
+                {task, cancelled}, timeout=budget.remaining(),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            cancelled.cancel()
+            if not task.done():
+                # Aborts the in-flight LLM request or tool await
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+        error = None if task.cancelled() else task.exception()
+        if not task.cancelled() and error is None:
+            return latest
+        if isinstance(error, GraphRecursionError):
+            budget.cancel("step limit")
+        elif isinstance(error, BudgetExceeded):
+            budget.cancel(error.reason)
+        elif error is not None:
+            raise error
+        else:
+            budget.cancel("deadline")
+
+        messages = list(latest.get("messages", []))
+        last = messages[-1] if messages else None
+        if pending:
+            # The answer being streamed when the turn stopped
+            partial = "".join(pending)
+        elif isinstance(last, AIMessage) and isinstance(last.content, str):
+            partial = last.content
+        else:
+            partial = ""
+        note = self._stop_note(budget.reason)
+        messages.append(AIMessage(content=f"{partial}\n\n{note}" if partial else note))
+        logger.warning("Turn stopped early", reason=budget.reason, tokens=budget.tokens_used)
+        return {**latest, "messages": messages, "stopped": budget.reason}
+
     async def run(
         self,
         message: str,
         conversation_history: Optional[List[BaseMessage]] = None,
         stream: bool = True,
+        budget: Optional[TurnBudget] = None,
     ) -> Any:
         """Run the agent with a user message.
 
@@ -134,6 +480,7 @@ class Orchestrator:
             message: User message
             conversation_history: Previous conversation messages
             stream: Whether to stream output
+            budget: Deadline, step and token limits (from config.py)
 
         Returns:
             Agent response
@@ -142,34 +489,164 @@ class Orchestrator:
         self.memory.add_conversation_turn("user", message)
 
         # Prepare inputs
-        inputs = {"messages": [HumanMessage(content=message)]}
-
-        # Run agent
-        if stream:
-            return await self.agent.ainvoke(inputs)
-        else:
-            return await self.agent.ainvoke(inputs)
+        inputs = self._build_inputs(message, conversation_history)
+        offered = self._select_tools(message, conversation_history)
+        tier = self._route(message)
+        budget = budget or TurnBudget()
+        run_config = self._start_turn(message, budget)
+        budget_token = set_current_budget(budget)
+        trace_token = self.recorder.start_turn(message) if self.recorder is not None else None
+        memo_token = self.tool_memo.new_scope() if self.tool_memo is not None else None
+        self._budgets.add(budget)
+        start = time.perf_counter()
+
+        try:
+            # Run agent, escalating to the strong model as needed
+            while True:
+                try:
+                    result = await self._invoke(
+                        self._get_agent(offered, tier), inputs, run_config, budget
+                    )
+                except Exception as e:
+                    if tier != FAST:
+                        raise
+                    self.router.record_escalation(f"error: {e}")
+                    tier = STRONG
+                    continue
+
+                if result.get("stopped"):
+                    break
+                messages = result.get("messages", [])
+                called = [
+                    call.get("name")
+                    for msg in messages
+                    for call in getattr(msg, "tool_calls", None) or []
+                ]
+                if tier == FAST and not called and not (messages and messages[-1].content):
+                    self.router.record_escalation("empty answer")
+                    tier = STRONG
+                    continue
+                break
+        finally:
+            # Signal tool threads still running for this turn to stop
+            if budget.reason is None:
+                budget.cancel("turn finished")
+            self._budgets.discard(budget)
+            reset_current_budget(budget_token)
+            if trace_token is not None:
+                self.recorder.end_turn(trace_token)
+            if memo_token is not None:
+                self.tool_memo.end_scope(memo_token)
+
+        if self.router is not None:
+            self.router.record(tier, time.perf_counter() - start)
+        if self.consolidator is not None:
+            self.consolidator.notify()
+        return result
 
     async def stream(
         self,
         message: str,
         conversation_history: Optional[List[BaseMessage]] = None,
+        budget: Optional[TurnBudget] = None,
     ):
         """Stream agent response.
 
         Args:
             message: User message
             conversation_history: Previous conversation messages
+            budget: Deadline, step and token limits (from config.py)
 
         Yields:
             Tokens from the agent response
         """
-        inputs = {"messages": [HumanMessage(content=message)]}
-        async for chunk in self.agent.astream(inputs):
-            if "messages" in chunk:
-                for msg in chunk["messages"]:
-                    if hasattr(msg, "content") and msg.content:
-                        yield msg.content
+        self.memory.add_conversation_turn("user", message)
+
+        inputs = self._build_inputs(message, conversation_history)
+        offered = self._select_tools(message, conversation_history)
+        tier = self._route(message)
+        budget = budget or TurnBudget()
+        run_config = self._start_turn(message, budget)
+        budget_token = set_current_budget(budget)
+        trace_token = self.recorder.start_turn(message) if self.recorder is not None else None
+        memo_token = self.tool_memo.new_scope() if self.tool_memo is not None else None
+        self._budgets.add(budget)
+        start = time.perf_counter()
+        parts = []
+        stopped = None
+
+        try:
+            while True:
+                called = []
+                chunks = self._get_agent(offered, tier).astream(
+                    inputs, config=run_config, stream_mode="messages"
+                ).__aiter__()
+                cancelled = budget.cancelled_future()
+                try:
+                    while True:
+                        step = asyncio.ensure_future(chunks.__anext__())
+                        await asyncio.wait(
+                            {step, cancelled}, timeout=budget.remaining(),
+                            return_when=asyncio.FIRST_COMPLETED,
+                        )
+                        if not step.done():
+                            # Deadline or cancel: abort the in-flight request
+                            step.cancel()
+                            await asyncio.gather(step, return_exceptions=True)
+                            budget.check()
+                            raise BudgetExceeded("deadline")
+                        try:
+                            msg, _metadata = step.result()
+                        except StopAsyncIteration:
+                            break
+                        if not isinstance(msg, AIMessageChunk):
+                            continue
+                        called.extend(c["name"] for c in msg.tool_call_chunks if c.get("name"))
+                        if msg.content:
+                            parts.append(msg.content)
+                            yield msg.content
+                except (GraphRecursionError, BudgetExceeded) as e:
+                    budget.cancel("step limit" if isinstance(e, GraphRecursionError) else e.reason)
+                    stopped = budget.reason
+                    await chunks.aclose()
+                except Exception as e:
+                    # Escalate only if nothing has reached the caller yet
+                    if tier != FAST or parts:
+                        raise
+                    self.router.record_escalation(f"error: {e}")
+                    tier = STRONG
+                    continue
+                finally:
+                    cancelled.cancel()
+
+                if stopped:
+                    note = self._stop_note(stopped)
+                    parts.append(f"\n\n{note}")
+                    yield f"\n\n{note}"
+                    logger.warning("Turn stopped early", reason=stopped, tokens=budget.tokens_used)
+                    break
+                # Retry only while nothing has reached the caller
+                if tier == FAST and not called and not parts:
+                    self.router.record_escalation("empty answer")
+                    tier = STRONG
+                    continue
+                break
+        finally:
+            if budget.reason is None:
+                budget.cancel("turn finished")
+            self._budgets.discard(budget)
+            reset_current_budget(budget_token)
+            if trace_token is not None:
+                self.recorder.end_turn(trace_token)
+            if memo_token is not None:
+                self.tool_memo.end_scope(memo_token)
+
+        if self.router is not None:
+            self.router.record(tier, time.perf_counter() - start)
 
         # Add assistant turn to memory
-        # Note: Would need to capture the full response first
+        response = "".join(p for p in parts if isinstance(p, str))
+        if response:
+            self.memory.add_conversation_turn("assistant", response)
+        if self.consolidator is not None:
+            self.consolidator.notify()
@@ -0,0 +1,224 @@
+"""Deterministic offline replay of recorded agent turns.
+
+Serves LLM responses from a trace written by
+`agent.instrumentation.TraceRecorder`, so the local parts of a turn
+(orchestration, memory, tools) can be benchmarked and regression-tested
+without calling a model.
+"""
+
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+
+class ReplayExhausted(RuntimeError):
+    """Raised when a replay asks for more LLM responses than were recorded."""
+
+
+def load_trace(path: str) -> list[dict]:
+    """Load a trace file grouped by turn.
+
+    Args:
+        path: Trace file
+
+    Returns:
+        List of turns: {"message", "duration_ms", "llm": [...], "tools": [...],
+        "subagents": {prompt: [...]}}, where "llm" holds the parent's
+        responses and "subagents" those of fan-out children by prompt
+    """
+    turns: list[dict] = []
+    for line in Path(path).read_text().splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if record["type"] == "turn":
+            turns.append({
+                "message": record["message"],
+                "duration_ms": record.get("duration_ms"),
+                "llm": [],
+                "tools": [],
+                "subagents": {},
+            })
+        elif turns and record["type"] == "llm" and record.get("subagent") is not None:
+            turns[-1]["subagents"].setdefault(record["subagent"], []).append(record)
+        elif turns and record["type"] == "llm":
+            turns[-1]["llm"].append(record)
+        elif turns and record["type"] == "tool":
+            turns[-1]["tools"].append(record)
+    return turns
+
+
+def to_message(record: dict) -> AIMessage:
+    """Rebuild an AI message from an "llm" trace record."""
+    return AIMessage(
+        content=record.get("content", ""),
+        tool_calls=[
+            {"name": c["name"], "args": c["args"], "id": c.get("id") or f"call_{uuid.uuid4().hex[:12]}"}
+            for c in record.get("tool_calls", [])
+        ],
+        usage_metadata=record.get("usage"),
+    )
+
+
+class ReplayChatModel(BaseChatModel):
+    """Chat model that returns recorded responses in order."""
+
+    responses: List[dict]
+    position: int = 0
+
+    @classmethod
+    def from_trace(cls, path: str) -> "ReplayChatModel":
+        """Create a replay model serving every LLM response in a trace.
+
+        Args:
+            path: Trace file
+
+        Returns:
+            Replay model
+        """
+        return cls(responses=[r for turn in load_trace(path) for r in turn["llm"]])
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ReplayChatModel":
+        """Tools are already baked into the recorded responses."""
+        return self
+
+    def _next(self, messages: List[BaseMessage]) -> AIMessage:
+        if self.position >= len(self.responses):
+            raise ReplayExhausted(
+                f"Trace has {len(self.responses)} LLM responses; replay asked for more"
+            )
+        record = self.responses[self.position]
+        self.position += 1
+        return to_message(record)
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self._next(messages))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        return self._generate(messages, stop=stop, **kwargs)
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        message = self._next(messages)
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content=message.content,
+            tool_call_chunks=[
+                {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i}
+                for i, c in enumerate(message.tool_calls)
+            ],
+            usage_metadata=message.usage_metadata,
+        ))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        for chunk in self._stream(messages, stop=stop, **kwargs):
+            yield chunk
+
+
+class SubagentReplayChatModel(ReplayChatModel):
+    """Replay model for fan-out children.
+
+    Children run concurrently, so the order they ask in differs between
+    runs; each child is answered from the responses recorded for its own
+    prompt instead.
+    """
+
+    by_prompt: Dict[str, List[dict]]
+    positions: Dict[str, int] = {}
+
+    @classmethod
+    def from_trace(cls, path: str) -> "SubagentReplayChatModel":
+        """Create a replay model serving the children's responses in a trace.
+
+        Args:
+            path: Trace file
+
+        Returns:
+            Replay model for the children
+        """
+        by_prompt: Dict[str, List[dict]] = {}
+        for turn in load_trace(path):
+            for prompt, records in turn["subagents"].items():
+                by_prompt.setdefault(prompt, []).extend(records)
+        return cls(responses=[], by_prompt=by_prompt)
+
+    def _next(self, messages: List[BaseMessage]) -> AIMessage:
+        prompt = next((str(m.content) for m in messages if isinstance(m, HumanMessage)), "")
+        records = self.by_prompt.get(prompt, [])
+        position = self.positions.get(prompt, 0)
+        if position >= len(records):
+            raise ReplayExhausted(
+                f"Trace has {len(records)} LLM responses for subagent {prompt[:40]!r}; "
+                "replay asked for more"
+            )
+        self.positions[prompt] = position + 1
+        return to_message(records[position])
+
+
+async def replay_trace(path: str) -> list[dict]:
+    """Replay every turn of a trace through a fresh orchestrator.
+
+    Memory is written to a scratch directory. LLM responses come from the
+    trace; everything else runs for real.
+
+    Args:
+        path: Trace file
+
+    Returns:
+        Per-turn results with local timing and the recorded duration
+    """
+    import tempfile
+    from .memory import MemorySystem
+    from .orchestrator import Orchestrator
+
+    scratch = Path(tempfile.mkdtemp(prefix="amy-replay-"))
+    orchestrator = Orchestrator(
+        replay_trace=path,
+        memory=MemorySystem(
+            semantic_file=str(scratch / "semantic_memory.md"),
+            episodic_dir=str(scratch / "episodic"),
+        ),
+    )
+
+    results = []
+    for turn in load_trace(path):
+        start = time.perf_counter()
+        result = await orchestrator.run(turn["message"], stream=False)
+        results.append({
+            "message": turn["message"],
+            "replay_ms": round((time.perf_counter() - start) * 1000, 2),
+            "recorded_ms": turn["duration_ms"],
+            "answer": result["messages"][-1].content,
+        })
+    return results
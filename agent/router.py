@@ -0,0 +1,155 @@
+"""Model routing between a fast and a strong model.
+
+A cheap heuristic classifier decides per turn whether the fast model is
+good enough; uncertain or complex turns go to the strong model, and
+failed fast turns are escalated.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Optional
+import structlog
+
+import config
+
+logger = structlog.get_logger(__name__)
+
+FAST = "fast"
+STRONG = "strong"
+
+# Words that suggest multi-step reasoning, code, or careful writing
+COMPLEX_HINTS = {
+    "analyze", "analyse", "architecture", "bug", "code", "compare", "debug",
+    "design", "explain", "function", "implement", "optimize", "plan", "prove",
+    "refactor", "review", "script", "strategy", "why", "write",
+}
+
+# Short conversational turns the fast model handles well
+SIMPLE_HINTS = {
+    "hi", "hello", "hey", "thanks", "thank", "ok", "okay", "yes", "no",
+    "bye", "remember", "prefer", "list", "show", "find", "read",
+}
+
+WORD_RE = re.compile(r"[a-z']+")
+
+
+@dataclass
+class RouteDecision:
+    """Routing decision for one turn."""
+
+    tier: str
+    confidence: float
+    reason: str
+
+
+class ModelRouter:
+    """Routes turns to the fast or strong model and tracks the savings."""
+
+    def __init__(
+        self,
+        min_confidence: Optional[float] = None,
+        ewma_alpha: float = 0.2,
+    ):
+        """Initialize model router.
+
+        Args:
+            min_confidence: Below this confidence a fast decision goes strong
+                (from config.py)
+            ewma_alpha: Smoothing factor for per-tier latency averages
+        """
+        self.min_confidence = (
+            config.LLM_ROUTING_MIN_CONFIDENCE if min_confidence is None else min_confidence
+        )
+        self.ewma_alpha = ewma_alpha
+        self.latency: dict[str, Optional[float]] = {FAST: None, STRONG: None}
+        self.stats: dict[str, float] = {
+            "fast_turns": 0,
+            "strong_turns": 0,
+            "escalations": 0,
+            "latency_saved_s": 0.0,
+        }
+
+    def classify(self, message: str) -> RouteDecision:
+        """Classify a turn as fast or strong.
+
+        Args:
+            message: User message
+
+        Returns:
+            Routing decision
+        """
+        words = WORD_RE.findall(message.lower())
+        score = 0.0
+        reasons = []
+
+        if len(words) > 60:
+            score += 0.6
+            reasons.append("long")
+        elif len(words) > 25:
+            score += 0.3
+            reasons.append("medium")
+
+        complex_hits = COMPLEX_HINTS.intersection(words)
+        if complex_hits:
+            score += 0.25 * len(complex_hits)
+            reasons.append("hints:" + ",".join(sorted(complex_hits)))
+        if "```" in message:
+            score += 0.5
+            reasons.append("code")
+        if message.count("?") > 1:
+            score += 0.2
+            reasons.append("questions")
+
+        if SIMPLE_HINTS.intersection(words) and len(words) <= 12:
+            score -= 0.3
+            reasons.append("simple")
+
+        # Score 0.5 is the decision boundary; confidence grows with distance
+        tier = STRONG if score >= 0.5 else FAST
+        confidence = min(1.0, 0.5 + abs(score - 0.5))
+        if tier == FAST and confidence < self.min_confidence:
+            tier = STRONG
+            reasons.append("low-confidence")
+
+        decision = RouteDecision(tier=tier, confidence=round(confidence, 2), reason=" ".join(reasons))
+        logger.info(
+            "Model route",
+            tier=decision.tier,
+            confidence=decision.confidence,
+            reason=decision.reason,
+        )
+        return decision
+
+    def record(self, tier: str, latency: float) -> None:
+        """Record a completed turn and log the estimated latency saving.
+
+        Args:
+            tier: Tier that produced the answer
+            latency: Turn latency in seconds
+        """
+        self.stats[f"{tier}_turns"] += 1
+        previous = self.latency[tier]
+        self.latency[tier] = (
+            latency if previous is None
+            else self.ewma_alpha * latency + (1 - self.ewma_alpha) * previous
+        )
+
+        saved = None
+        if tier == FAST and self.latency[STRONG] is not None:
+            saved = self.latency[STRONG] - latency
+            self.stats["latency_saved_s"] += saved
+        logger.info(
+            "Model turn",
+            tier=tier,
+            latency_ms=round(latency * 1000),
+            latency_saved_ms=round(saved * 1000) if saved is not None else None,
+        )
+
+    def record_escalation(self, reason: str) -> None:
+        """Record that a fast turn was escalated to the strong model.
+
+        Args:
+            reason: Why the fast answer was rejected
+        """
+        self.stats["escalations"] += 1
+        logger.info("Model escalation", reason=reason)
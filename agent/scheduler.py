@@ -0,0 +1,357 @@
+"""Process-wide LLM call scheduler.
+
+Every LLM call in the process goes through one scheduler that enforces
+request and token rate limits, caps concurrency, serves interactive calls
+ahead of batch work, and retries rate-limit and transient errors with
+jittered exponential backoff (honouring Retry-After).
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, TypeVar
+import structlog
+
+import config
+
+logger = structlog.get_logger(__name__)
+
+T = TypeVar("T")
+
+# Priority classes (lower runs first)
+INTERACTIVE = 0
+BATCH = 1
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {"APIConnectionError", "APITimeoutError", "TimeoutException", "ConnectError"}
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        """Initialize token bucket.
+
+        Args:
+            per_minute: Refill rate per minute (<= 0 disables the limit)
+            capacity: Burst size (default: one minute's worth)
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        """Remove tokens (call after wait_time returned 0)."""
+        if self.rate <= 0:
+            return
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        """Return tokens taken in excess (a negative amount takes more)."""
+        if self.rate <= 0:
+            return
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Check whether an LLM error is worth retrying.
+
+    Args:
+        error: Exception raised by the call
+
+    Returns:
+        True for rate limits, timeouts, connection and 5xx errors
+    """
+    status = getattr(error, "status_code", None)
+    if status in RETRYABLE_STATUS:
+        return True
+    return type(error).__name__ in RETRYABLE_ERRORS
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Read the server's requested delay from an error response.
+
+    Args:
+        error: Exception raised by the call
+
+    Returns:
+        Delay in seconds, or None if the server did not ask for one
+    """
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except ValueError:
+        return None
+    return None
+
+
+class LLMScheduler:
+    """Rate-limit-aware scheduler for LLM calls."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+    ):
+        """Initialize scheduler.
+
+        Args:
+            requests_per_minute: Request quota (from config.py)
+            tokens_per_minute: Token quota (from config.py)
+            max_concurrency: Maximum calls in flight (from config.py)
+            max_retries: Retries per call (from config.py)
+            base_delay: First backoff delay in seconds
+            max_delay: Backoff ceiling in seconds
+        """
+        rpm = config.LLM_REQUESTS_PER_MINUTE if requests_per_minute is None else requests_per_minute
+        tpm = config.LLM_TOKENS_PER_MINUTE if tokens_per_minute is None else tokens_per_minute
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency or config.LLM_MAX_CONCURRENCY
+        self.max_retries = config.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self.in_flight = 0
+        self._queue: list[tuple[int, int, float, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._paused_until = 0.0
+
+        self.stats: dict[str, Any] = {
+            "calls": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failures": 0,
+            "max_queue_depth": 0,
+            "tokens_refunded": 0,
+            "wait_s": {name: 0.0 for name in PRIORITY_NAMES.values()},
+        }
+
+    def metrics(self) -> dict[str, Any]:
+        """Current queue depth, in-flight calls and cumulative counters."""
+        return {
+            "queue_depth": sum(1 for *_, fut in self._queue if not fut.done()),
+            "in_flight": self.in_flight,
+            **self.stats,
+        }
+
+    def _pump(self) -> None:
+        """Grant slots to queued calls while limits allow."""
+        self._timer = None
+        while self._queue:
+            _, _, tokens, fut = self._queue[0]
+            if fut.done():
+                heapq.heappop(self._queue)
+                continue
+            if self.in_flight >= self.max_concurrency:
+                return
+            wait = max(
+                self._paused_until - time.monotonic(),
+                self.requests.wait_time(1),
+                self.tokens.wait_time(tokens),
+            )
+            if wait > 0:
+                loop = asyncio.get_running_loop()
+                self._timer = loop.call_later(wait, self._pump)
+                return
+            heapq.heappop(self._queue)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self.in_flight += 1
+            fut.set_result(None)
+
+    async def _acquire(self, priority: int, tokens: float) -> None:
+        """Wait for a slot; the caller must call _release afterwards."""
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._queue, (priority, next(self._seq), tokens, fut))
+        depth = sum(1 for *_, f in self._queue if not f.done())
+        self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], depth)
+
+        start = time.monotonic()
+        if self._timer is None:
+            self._pump()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            # Granted just before cancellation: hand the slot back
+            if fut.done() and not fut.cancelled():
+                self._release()
+            raise
+        finally:
+            name = PRIORITY_NAMES.get(priority, str(priority))
+            self.stats["wait_s"][name] = self.stats["wait_s"].get(name, 0.0) + time.monotonic() - start
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        if self._timer is None:
+            self._pump()
+
+    def settle(self, estimated: float, used: Optional[float]) -> None:
+        """Correct the token quota once a call's actual usage is known.
+
+        Calls are admitted on an estimate that assumes the full output
+        limit; refunding the difference keeps the token bucket from
+        throttling far below the real quota.
+
+        Calls that used more than their estimate are not charged extra.
+
+        Args:
+            estimated: Tokens charged when the call was admitted
+            used: Tokens the call actually consumed (None if unknown)
+        """
+        if used is None or self.tokens.rate <= 0:
+            return  # Unknown usage, or no token quota to correct
+        refund = max(0, min(estimated, self.tokens.capacity) - used)
+        self.tokens.refund(refund)
+        self.stats["tokens_refunded"] += refund
+        if refund > 0 and self._timer is not None:
+            # Queued calls may fit now
+            self._timer.cancel()
+            self._pump()
+
+    def _backoff(self, attempt: int, error: BaseException) -> float:
+        """Delay before the next attempt; pauses all calls on a rate limit."""
+        requested = retry_after(error)
+        delay = requested if requested is not None else random.uniform(
+            0, min(self.max_delay, self.base_delay * 2 ** attempt)
+        )
+        if getattr(error, "status_code", None) == 429:
+            self.stats["rate_limited"] += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        self.stats["retries"] += 1
+        logger.warning(
+            "LLM call retry",
+            attempt=attempt + 1,
+            delay_s=round(delay, 2),
+            error=type(error).__name__,
+        )
+        return delay
+
+    async def submit(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        priority: int = INTERACTIVE,
+        tokens: float = 1,
+    ) -> T:
+        """Run an LLM call under the scheduler.
+
+        Args:
+            fn: Factory returning a fresh awaitable for each attempt
+            priority: Priority class (INTERACTIVE or BATCH)
+            tokens: Estimated tokens the call will consume
+
+        Returns:
+            Result of the call
+
+        Raises:
+            Exception: The last error once retries are exhausted
+        """
+        self.stats["calls"] += 1
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(priority, tokens)
+            try:
+                return await fn()
+            except Exception as e:
+                if not is_retryable(e) or attempt == self.max_retries:
+                    self.stats["failures"] += 1
+                    raise
+                delay = self._backoff(attempt, e)
+            finally:
+                self._release()
+            await asyncio.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    async def stream(
+        self,
+        fn: Callable[[], AsyncIterator[T]],
+        priority: int = INTERACTIVE,
+        tokens: float = 1,
+    ) -> AsyncIterator[T]:
+        """Run a streaming LLM call under the scheduler.
+
+        The slot is held for the whole stream. Errors are retried only
+        before the first chunk, so callers never see duplicated output.
+
+        Args:
+            fn: Factory returning a fresh async iterator for each attempt
+            priority: Priority class (INTERACTIVE or BATCH)
+            tokens: Estimated tokens the call will consume
+
+        Yields:
+            Chunks from the stream
+        """
+        self.stats["calls"] += 1
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(priority, tokens)
+            started = False
+            try:
+                async for chunk in fn():
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started or not is_retryable(e) or attempt == self.max_retries:
+                    self.stats["failures"] += 1
+                    raise
+                delay = self._backoff(attempt, e)
+            finally:
+                self._release()
+            await asyncio.sleep(delay)
+
+
+_scheduler: Optional[LLMScheduler] = None
+
+
+def get_scheduler() -> LLMScheduler:
+    """Get the process-wide LLM scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LLMScheduler()
+    return _scheduler
+
+
+def set_scheduler(scheduler: Optional[LLMScheduler]) -> Optional[LLMScheduler]:
+    """Replace the process-wide LLM scheduler (e.g. with other limits).
+
+    Args:
+        scheduler: New scheduler (None builds a default one on next use)
+
+    Returns:
+        The replaced scheduler (None if none was built yet)
+    """
+    global _scheduler
+    previous, _scheduler = _scheduler, scheduler
+    return previous
@@ -1,3 +1,5 @@
 """Agent Subagents."""
 
-__all__ = []
+from .fanout import FanOutResult, FanOutTool, SubagentExecutor, SubagentResult, SubagentTask
+
+__all__ = ["FanOutResult", "FanOutTool", "SubagentExecutor", "SubagentResult", "SubagentTask"]
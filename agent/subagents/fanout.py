@@ -0,0 +1,271 @@
+"""Parallel subagent fan-out.
+
+Runs isolated child agents, each with its own small context and tool
+subset, with bounded parallelism, then merges their results and reports
+their token usage and latency back to the parent. Children run under the
+parent turn's budget: its deadline and cancellation stop them, and their
+tokens count against it.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables.config import var_child_runnable_config
+from langchain_core.tools import BaseTool, tool
+from langgraph.prebuilt import create_react_agent
+import structlog
+
+import config
+from ..budget import BudgetCallbackHandler, BudgetExceeded, get_current_budget
+from ..instrumentation import TraceRecorder
+from ..tools.result_store import get_result_store
+
+logger = structlog.get_logger(__name__)
+
+# Tools children get when the caller names none (read-only)
+DEFAULT_CHILD_TOOLS = ["read_file", "list_directory", "search_files", "grep", "read_tool_result"]
+
+
+@dataclass
+class SubagentTask:
+    """A unit of work for one child agent."""
+
+    prompt: str
+    name: Optional[str] = None
+    tools: list[str] = field(default_factory=list)  # Tool names; empty means no tools
+    system_prompt: Optional[str] = None
+
+
+@dataclass
+class SubagentResult:
+    """Outcome of one child agent."""
+
+    name: str
+    output: str = ""
+    error: Optional[str] = None
+    latency_s: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    llm_calls: int = 0
+
+
+@dataclass
+class FanOutResult:
+    """Merged outcome of a fan-out."""
+
+    results: list[SubagentResult]
+    merged: str
+    wall_time_s: float
+
+    @property
+    def input_tokens(self) -> int:
+        return sum(r.input_tokens for r in self.results)
+
+    @property
+    def output_tokens(self) -> int:
+        return sum(r.output_tokens for r in self.results)
+
+    @property
+    def serial_time_s(self) -> float:
+        """Time the children would have taken one after another."""
+        return sum(r.latency_s for r in self.results)
+
+
+class SubagentExecutor:
+    """Spawns child agents concurrently with bounded parallelism."""
+
+    def __init__(
+        self,
+        llm: Any,
+        tools: list[BaseTool],
+        max_parallel: Optional[int] = None,
+        recorder: Optional[TraceRecorder] = None,
+    ):
+        """Initialize subagent executor.
+
+        Args:
+            llm: Chat model shared by the children
+            tools: Tools children may be given
+            max_parallel: Maximum children running at once (from config.py)
+            recorder: Records the children's LLM responses into the
+                parent's trace
+        """
+        self.llm = llm
+        self.tools = {t.name: t for t in tools}
+        self.max_parallel = max_parallel or config.SUBAGENT_MAX_PARALLEL
+        self.recorder = recorder
+        self._agents: dict[tuple, Any] = {}
+
+    def _get_agent(self, task: SubagentTask):
+        """Get a compiled child agent for a task's tools and prompt."""
+        prompt = task.system_prompt or config.SUBAGENT_SYSTEM_PROMPT
+        key = (tuple(task.tools), prompt)
+        agent = self._agents.get(key)
+        if agent is None:
+            tools = [self.tools[name] for name in task.tools if name in self.tools]
+            agent = create_react_agent(self.llm, tools, prompt=prompt)
+            self._agents[key] = agent
+        return agent
+
+    async def run(self, task: SubagentTask) -> SubagentResult:
+        """Run one child agent with a fresh context.
+
+        Args:
+            task: Work for the child
+
+        Returns:
+            Child result (errors are captured, not raised)
+
+        Raises:
+            BudgetExceeded: If the parent turn must stop
+        """
+        result = SubagentResult(name=task.name or task.prompt[:40])
+        start = time.perf_counter()
+        try:
+            state = await self._invoke(task)
+            messages = state.get("messages", [])
+            for msg in messages:
+                usage = getattr(msg, "usage_metadata", None)
+                if usage:
+                    result.llm_calls += 1
+                    result.input_tokens += usage.get("input_tokens", 0)
+                    result.output_tokens += usage.get("output_tokens", 0)
+            if messages:
+                content = messages[-1].content
+                result.output = content if isinstance(content, str) else str(content)
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            result.error = str(e)
+        result.latency_s = time.perf_counter() - start
+        return result
+
+    async def _ainvoke(self, task: SubagentTask, callbacks: list[Any]) -> dict:
+        # A child is a run of its own: drop the callbacks inherited from the
+        # fan_out tool run (set in this task's context copy only)
+        var_child_runnable_config.set(None)
+        inputs = {"messages": [HumanMessage(content=task.prompt)]}
+        return await self._get_agent(task).ainvoke(inputs, config={"callbacks": callbacks})
+
+    async def _invoke(self, task: SubagentTask) -> dict:
+        """Run a child agent under the current turn's budget, if any.
+
+        The child gets only its own callbacks, so its tokens stay out of
+        the parent's stream, count against the budget once and are traced
+        under its prompt.
+
+        Args:
+            task: Work for the child
+
+        Returns:
+            Final child agent state
+
+        Raises:
+            BudgetExceeded: If the parent turn was cancelled or hit its deadline
+        """
+        callbacks: list[Any] = []
+        if self.recorder is not None:
+            callbacks.append(self.recorder.for_subagent(task.prompt))
+        budget = get_current_budget()
+        if budget is None:
+            return await asyncio.ensure_future(self._ainvoke(task, callbacks))
+
+        budget.check_call()
+        callbacks.append(BudgetCallbackHandler(budget))
+        invocation = asyncio.ensure_future(self._ainvoke(task, callbacks))
+        cancelled = budget.cancelled_future()
+        try:
+            await asyncio.wait(
+                {invocation, cancelled}, timeout=budget.remaining(),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+        finally:
+            cancelled.cancel()
+            if not invocation.done():
+                invocation.cancel()
+                await asyncio.gather(invocation, return_exceptions=True)
+        if invocation.cancelled():
+            budget.check()
+            raise BudgetExceeded("deadline")
+        return invocation.result()
+
+    async def fan_out(self, tasks: list[SubagentTask]) -> FanOutResult:
+        """Run child agents concurrently and merge their outputs.
+
+        Args:
+            tasks: Work items, one child each
+
+        Returns:
+            Merged result with per-child usage and latency
+        """
+        semaphore = asyncio.Semaphore(self.max_parallel)
+
+        async def bounded(task: SubagentTask) -> SubagentResult:
+            async with semaphore:
+                return await self.run(task)
+
+        start = time.perf_counter()
+        results = list(await asyncio.gather(*(bounded(t) for t in tasks)))
+        outcome = FanOutResult(
+            results=results,
+            merged=self.merge(results),
+            wall_time_s=time.perf_counter() - start,
+        )
+        logger.info(
+            "Subagent fan-out",
+            children=len(results),
+            failed=sum(1 for r in results if r.error),
+            input_tokens=outcome.input_tokens,
+            output_tokens=outcome.output_tokens,
+            wall_time_s=round(outcome.wall_time_s, 2),
+            serial_time_s=round(outcome.serial_time_s, 2),
+        )
+        return outcome
+
+    @staticmethod
+    def merge(results: list[SubagentResult]) -> str:
+        """Merge child outputs into one markdown document.
+
+        Args:
+            results: Child results in task order
+
+        Returns:
+            One section per child
+        """
+        sections = []
+        for r in results:
+            body = f"Error: {r.error}" if r.error else r.output
+            sections.append(f"## {r.name}\n\n{body}")
+        return "\n\n".join(sections)
+
+
+class FanOutTool:
+    """Tool that lets the agent split wide work across child agents."""
+
+    def __init__(self, fan_out: Callable[[list[SubagentTask]], Awaitable[FanOutResult]]):
+        """Initialize fan-out tool.
+
+        Args:
+            fan_out: Runs the children (e.g. Orchestrator.fan_out)
+        """
+        self._fan_out = fan_out
+
+    @tool
+    async def fan_out(self, prompts: list[str], tools: Optional[list[str]] = None) -> str:
+        """Run independent subtasks in parallel, each in a fresh helper agent.
+
+        Use for wide work that splits into self-contained parts, such as one
+        file, module or question per part. Helpers see only their own prompt.
+
+        Args:
+            prompts: One self-contained instruction per helper
+            tools: Tool names the helpers may use (default: read-only tools)
+
+        Returns:
+            Helper outputs, one section per subtask
+        """
+        names = [n for n in (DEFAULT_CHILD_TOOLS if tools is None else tools) if n != "fan_out"]
+        outcome = await self._fan_out([SubagentTask(prompt=p, tools=names) for p in prompts])
+        return get_result_store().spill("fan_out", outcome.merged)
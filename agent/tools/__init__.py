@@ -1,6 +1,18 @@
 """Agent Tools."""
 
+from .binding import bind_tool
 from .file_tool import FileTool
+from .memo import ToolMemo
+from .result_store import ResultStoreTool, ToolResultStore
 from .search_tool import SearchTool
+from .selector import ToolSelector
 
-__all__ = ["FileTool", "SearchTool"]
+__all__ = [
+    "FileTool",
+    "ResultStoreTool",
+    "SearchTool",
+    "ToolMemo",
+    "ToolResultStore",
+    "ToolSelector",
+    "bind_tool",
+]
@@ -0,0 +1,36 @@
+"""Binding of method tools to their instances.
+
+Tools are declared with `@tool` on methods, so the decorated tool's
+function still expects `self`. Binding it to an instance gives a tool the
+agent can execute. Argument schemas depend only on the method, so they
+are inferred once per process and reused by later bindings.
+"""
+
+from typing import Any
+from langchain_core.tools import BaseTool, StructuredTool
+
+# Argument schemas per tool name
+_args_schemas: dict[str, Any] = {}
+
+
+def bind_tool(owner: Any, method_tool: BaseTool) -> BaseTool:
+    """Bind a tool declared on a method to an instance.
+
+    Args:
+        owner: Instance the tool method belongs to
+        method_tool: Tool created by `@tool` on the method
+
+    Returns:
+        Executable tool with the same name and description
+    """
+    func = getattr(method_tool, "func", None)
+    coroutine = getattr(method_tool, "coroutine", None)
+    bound = StructuredTool.from_function(
+        func=func.__get__(owner) if func is not None else None,
+        coroutine=coroutine.__get__(owner) if coroutine is not None else None,
+        name=method_tool.name,
+        description=method_tool.description,
+        args_schema=_args_schemas.get(method_tool.name),
+    )
+    _args_schemas.setdefault(method_tool.name, bound.args_schema)
+    return bound
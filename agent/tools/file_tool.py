@@ -1,23 +1,29 @@
 """File operations tool."""
 
+import os
 from pathlib import Path
 from typing import Optional
 from langchain_core.tools import tool
 import structlog
 
+from .memo import ToolMemo, memoized
+from .result_store import get_result_store
+
 logger = structlog.get_logger(__name__)
 
 
 class FileTool:
     """Tool for file operations."""
 
-    def __init__(self, base_path: str = "."):
+    def __init__(self, base_path: str = ".", memo: Optional[ToolMemo] = None):
         """Initialize file tool.
 
         Args:
             base_path: Base path for file operations
+            memo: Memo for read results (shared with other read-only tools)
         """
         self.base_path = Path(base_path)
+        self.memo = memo
 
     @tool
     def read_file(self, path: str) -> str:
@@ -29,13 +35,17 @@ class FileTool:
         Returns:
             File contents or error message
         """
-        try:
-            filepath = self.base_path / path
-            if not filepath.exists():
-                return f"Error: File not found: {path}"
-            return filepath.read_text()
-        except Exception as e:
-            return f"Error reading file {path}: {e}"
+        filepath = self.base_path / path
+
+        def read() -> str:
+            try:
+                if not filepath.exists():
+                    return f"Error: File not found: {path}"
+                return get_result_store().spill("read_file", filepath.read_text())
+            except Exception as e:
+                return f"Error reading file {path}: {e}"
+
+        return memoized(self.memo, "read_file", {"path": os.path.normpath(path)}, filepath, read)
 
     @tool
     def write_file(self, path: str, content: str) -> str:
@@ -52,6 +62,8 @@ class FileTool:
             filepath = self.base_path / path
             filepath.parent.mkdir(parents=True, exist_ok=True)
             filepath.write_text(content)
+            if self.memo is not None:
+                self.memo.invalidate(filepath)
             logger.info("Wrote file", path=path)
             return f"Successfully wrote to {path}"
         except Exception as e:
@@ -67,19 +79,27 @@ class FileTool:
         Returns:
             Directory listing
         """
-        try:
-            dirpath = self.base_path / path
-            if not dirpath.exists() or not dirpath.is_dir():
-                return f"Error: Directory not found: {path}"
+        dirpath = self.base_path / path
 
-            items = []
-            for item in sorted(dirpath.iterdir()):
-                item_type = "DIR" if item.is_dir() else "FILE"
-                items.append(f"[{item_type}] {item.name}")
+        def list_items() -> str:
+            try:
+                if not dirpath.exists() or not dirpath.is_dir():
+                    return f"Error: Directory not found: {path}"
 
-            return "\n".join(items) if items else "(empty directory)"
-        except Exception as e:
-            return f"Error listing directory {path}: {e}"
+                items = []
+                for item in sorted(dirpath.iterdir()):
+                    item_type = "DIR" if item.is_dir() else "FILE"
+                    items.append(f"[{item_type}] {item.name}")
+
+                if not items:
+                    return "(empty directory)"
+                return get_result_store().spill("list_directory", "\n".join(items))
+            except Exception as e:
+                return f"Error listing directory {path}: {e}"
+
+        return memoized(
+            self.memo, "list_directory", {"path": os.path.normpath(path)}, dirpath, list_items
+        )
 
     @tool
     def create_directory(self, path: str) -> str:
@@ -94,6 +114,8 @@ class FileTool:
         try:
             dirpath = self.base_path / path
             dirpath.mkdir(parents=True, exist_ok=True)
+            if self.memo is not None:
+                self.memo.invalidate(dirpath)
             logger.info("Created directory", path=path)
             return f"Successfully created directory: {path}"
         except Exception as e:
@@ -0,0 +1,219 @@
+"""Memoization of read-only tool results.
+
+Within a ReAct loop the model often repeats a read with identical
+arguments. ToolMemo returns the earlier result as long as the files it
+depends on are unchanged: single paths are checked by mtime and size,
+directory trees by a running watcher's change journal. Without a watcher
+covering the tree, tree-wide results are not memoized, since checking
+them would cost a walk as long as the search itself. Write tools
+invalidate affected entries explicitly.
+
+Results are kept per turn. The turn's scope is held in a context
+variable, like the turn budget, so concurrent turns sharing one memo
+neither see nor clear each other's entries.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+import structlog
+
+from ..watcher import MODIFIED, FileWatcher, is_under
+
+logger = structlog.get_logger(__name__)
+
+
+def path_stamp(path: Path) -> Optional[tuple[int, int]]:
+    """Modification time and size of a path (None if missing)."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+@dataclass
+class MemoEntry:
+    path: str  # Absolute path the result depends on
+    tree: bool  # Depends on everything under path
+    stamp: Any
+    result: str
+
+
+@dataclass
+class MemoScope:
+    """Results memoized during one turn."""
+
+    watch_seq: int
+    entries: OrderedDict = field(default_factory=OrderedDict)  # (tool, args) -> MemoEntry
+    hits: int = 0
+    misses: int = 0
+
+
+_current_scope: ContextVar[Optional[MemoScope]] = ContextVar("amy_memo_scope", default=None)
+
+
+class ToolMemo:
+    """Cache of read-only tool results shared by the tools of one agent."""
+
+    def __init__(self, watcher: Optional[FileWatcher] = None, max_entries: int = 256):
+        """Initialize tool memo.
+
+        Args:
+            watcher: Running file watcher; tree-wide results are memoized only
+                under paths it covers, and validated from its change journal
+            max_entries: Results kept per turn (least recently used are dropped)
+        """
+        self.watcher = watcher
+        self.max_entries = max_entries
+        self._live: dict[int, MemoScope] = {}
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        # Tools may run in worker threads
+        self._lock = threading.Lock()
+
+    def new_scope(self) -> Any:
+        """Start memoizing for a turn in the current context.
+
+        Returns:
+            Token to pass to end_scope
+        """
+        scope = MemoScope(watch_seq=self.watcher.seq if self.watcher is not None else 0)
+        with self._lock:
+            self._live[id(scope)] = scope
+        return _current_scope.set(scope)
+
+    def end_scope(self, token: Any) -> None:
+        """End the turn started with `token`: log its hit rate and drop its results.
+
+        Args:
+            token: Token returned by new_scope
+        """
+        scope = _current_scope.get()
+        _current_scope.reset(token)
+        if scope is None:
+            return
+        with self._lock:
+            self._live.pop(id(scope), None)
+        if scope.hits + scope.misses:
+            logger.info(
+                "Tool memo",
+                hits=scope.hits,
+                misses=scope.misses,
+                hit_rate=round(scope.hits / (scope.hits + scope.misses), 3),
+            )
+
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the memo since creation."""
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def _watched(self, path: str) -> bool:
+        return self.watcher is not None and self.watcher.running and self.watcher.covers(path)
+
+    def _apply_watcher_changes(self, scope: MemoScope) -> None:
+        """Drop a scope's tree entries under paths the watcher saw change."""
+        if self.watcher is None or not self.watcher.running:
+            return
+        seq = self.watcher.seq
+        changes = self.watcher.changes_since(scope.watch_seq)
+        scope.watch_seq = seq
+        for key, entry in list(scope.entries.items()):
+            if not entry.tree:
+                continue
+            if not self._watched(entry.path) or changes is None or any(
+                is_under(c.path, entry.path) or (c.kind != MODIFIED and is_under(entry.path, c.path))
+                for c in changes
+            ):
+                del scope.entries[key]
+
+    def call(
+        self,
+        tool_name: str,
+        args: dict[str, Any],
+        path: Path,
+        compute: Callable[[], str],
+        tree: bool = False,
+    ) -> str:
+        """Return a memoized tool result, computing it if stale or missing.
+
+        Outside a turn, and for tree-wide results under paths no running
+        watcher covers, the result is computed directly.
+
+        Args:
+            tool_name: Tool being called
+            args: Tool arguments (all of them, defaults included)
+            path: File or directory the result depends on
+            compute: Produces the result
+            tree: The result depends on everything under `path`
+
+        Returns:
+            Tool result
+        """
+        scope = _current_scope.get()
+        abspath = os.path.abspath(path)
+        if scope is None or (tree and not self._watched(abspath)):
+            return compute()
+
+        key = (tool_name, json.dumps(args, sort_keys=True, default=str))
+        # Stamp before computing, so a change during compute is seen next time;
+        # tree entries live until the watcher reports a change under them
+        stamp = None if tree else path_stamp(Path(abspath))
+
+        with self._lock:
+            self._apply_watcher_changes(scope)
+            entry = scope.entries.get(key)
+            if entry is not None and entry.stamp == stamp:
+                scope.entries.move_to_end(key)
+                scope.hits += 1
+                self.stats["hits"] += 1
+                return entry.result
+            scope.misses += 1
+            self.stats["misses"] += 1
+
+        result = compute()
+        # Errors (including cancellation) are not worth repeating
+        if not result.startswith("Error"):
+            with self._lock:
+                scope.entries[key] = MemoEntry(path=abspath, tree=tree, stamp=stamp, result=result)
+                scope.entries.move_to_end(key)
+                if len(scope.entries) > self.max_entries:
+                    scope.entries.popitem(last=False)
+        return result
+
+    def invalidate(self, path: Path) -> None:
+        """Drop results of every running turn that depend on a path a write tool just changed.
+
+        Args:
+            path: File or directory that was written
+        """
+        abspath = os.path.abspath(path)
+        with self._lock:
+            for scope in self._live.values():
+                stale = [
+                    key for key, entry in scope.entries.items()
+                    if is_under(entry.path, abspath)
+                    or entry.path == os.path.dirname(abspath)
+                    or (entry.tree and is_under(abspath, entry.path))
+                ]
+                for key in stale:
+                    del scope.entries[key]
+                self.stats["invalidations"] += len(stale)
+
+
+def memoized(
+    memo: Optional[ToolMemo],
+    tool_name: str,
+    args: dict[str, Any],
+    path: Path,
+    compute: Callable[[], str],
+    tree: bool = False,
+) -> str:
+    """Run a read-only tool through a memo, or directly when there is none."""
+    if memo is None:
+        return compute()
+    return memo.call(tool_name, args, path, compute, tree=tree)
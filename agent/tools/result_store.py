@@ -0,0 +1,140 @@
+"""Spill store for oversized tool outputs.
+
+Tool outputs over a size threshold are saved outside the workspace and
+replaced with a head/tail preview plus a handle. The model pages through
+the full output with `read_tool_result`, so prompt size per ReAct step
+stays bounded no matter how large a tool result is.
+"""
+
+import hashlib
+import time
+from pathlib import Path
+from typing import Optional
+from langchain_core.tools import tool
+import structlog
+
+import config
+
+logger = structlog.get_logger(__name__)
+
+
+class ToolResultStore:
+    """Stores large tool outputs and serves them back by handle."""
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        max_chars: Optional[int] = None,
+        preview_lines: int = 20,
+        ttl_s: Optional[float] = None,
+    ):
+        """Initialize result store.
+
+        Args:
+            root: Directory for stored outputs (from config.py)
+            max_chars: Outputs longer than this are spilled (from config.py)
+            preview_lines: Lines kept from each end in the preview
+            ttl_s: Stored outputs older than this are deleted (from config.py)
+        """
+        self.root = Path(root or config.TOOL_RESULT_DIR)
+        self.max_chars = max_chars or config.TOOL_RESULT_MAX_CHARS
+        self.preview_lines = preview_lines
+        self.ttl_s = config.TOOL_RESULT_TTL_S if ttl_s is None else ttl_s
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.prune()
+
+    def prune(self) -> None:
+        """Delete stored outputs older than the TTL."""
+        cutoff = time.time() - self.ttl_s
+        for path in self.root.glob("*.txt"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+            except OSError:
+                continue
+
+    def _path(self, handle: str) -> Path:
+        return self.root / f"{handle}.txt"
+
+    def spill(self, tool_name: str, output: str) -> str:
+        """Return output as-is if small, else store it and return a preview.
+
+        Args:
+            tool_name: Tool that produced the output
+            output: Full tool output
+
+        Returns:
+            Output or head/tail preview with a handle
+        """
+        if len(output) <= self.max_chars:
+            return output
+
+        handle = hashlib.sha1(output.encode()).hexdigest()[:12]
+        path = self._path(handle)
+        if not path.exists():
+            path.write_text(output)
+
+        lines = output.split("\n")
+        # Each end gets half the budget so one huge line cannot blow the preview
+        budget = self.max_chars // 2
+        head = "\n".join(lines[:self.preview_lines])[:budget]
+        tail = "\n".join(lines[-self.preview_lines:])[-budget:] if len(lines) > 2 * self.preview_lines else ""
+        logger.info("Spilled tool output", tool=tool_name, handle=handle, chars=len(output))
+        notice = (
+            f"... [{tool_name} output truncated: {len(lines)} lines, {len(output)} chars. "
+            f"Full output stored as handle '{handle}'. "
+            f"Call read_tool_result(handle='{handle}', start_line=N, num_lines=M) to read more.] ..."
+        )
+        return "\n".join(part for part in (head, notice, tail) if part)
+
+    def read(self, handle: str, start_line: int = 1, num_lines: int = 100) -> str:
+        """Read a line range of a stored output.
+
+        Args:
+            handle: Handle from a spilled preview
+            start_line: First line to return (1-based)
+            num_lines: Number of lines to return
+
+        Returns:
+            Requested lines (still bounded by the spill threshold)
+        """
+        path = self._path(handle)
+        if not handle.isalnum() or not path.exists():
+            return f"Error: Unknown tool result handle: {handle}"
+
+        lines = path.read_text().split("\n")
+        start = max(1, start_line)
+        chunk = "\n".join(lines[start - 1:start - 1 + max(1, num_lines)])
+        end = min(len(lines), start - 1 + max(1, num_lines))
+        if len(chunk) > self.max_chars:
+            chunk = chunk[:self.max_chars] + "\n... [page truncated; request fewer lines]"
+        return f"[{handle}: lines {start}-{end} of {len(lines)}]\n{chunk}"
+
+
+_store: Optional[ToolResultStore] = None
+
+
+def get_result_store() -> ToolResultStore:
+    """Get the process-wide tool result store."""
+    global _store
+    if _store is None:
+        _store = ToolResultStore()
+    return _store
+
+
+class ResultStoreTool:
+    """Tool for paging through spilled tool outputs."""
+
+    @tool
+    def read_tool_result(self, handle: str, start_line: int = 1, num_lines: int = 100) -> str:
+        """Read more of a large tool output that was truncated.
+
+        Args:
+            handle: Handle shown in the truncated output
+            start_line: First line to return (1-based)
+            num_lines: Number of lines to return
+
+        Returns:
+            Requested lines of the stored output
+        """
+        return get_result_store().read(handle, start_line, num_lines)
@@ -1,23 +1,89 @@
 """Search tool."""
 
+import os
+import threading
 from pathlib import Path
 from typing import Optional
 from langchain_core.tools import tool
 import structlog
 
+import config
+from ..budget import BudgetExceeded, check_cancelled
+from ..watcher import MODIFIED, FileWatcher, is_under
+from .memo import ToolMemo, memoized
+from .result_store import get_result_store
+
 logger = structlog.get_logger(__name__)
 
 
 class SearchTool:
     """Tool for searching files and content."""
 
-    def __init__(self, base_path: str = "."):
+    def __init__(
+        self,
+        base_path: str = ".",
+        watcher: Optional[FileWatcher] = None,
+        memo: Optional[ToolMemo] = None,
+    ):
         """Initialize search tool.
 
         Args:
             base_path: Base path for search operations
+            watcher: Running file watcher; when given, directory listings
+                are cached until it reports a change under them
+            memo: Memo for search results (shared with other read-only tools)
         """
         self.base_path = Path(base_path)
+        self.watcher = watcher
+        self.memo = memo
+        self._listings: dict[str, list[Path]] = {}
+        self._watch_seq = 0
+        # Tools may run in worker threads
+        self._lock = threading.Lock()
+
+    def _walk(self, search_path: Path) -> list[Path]:
+        """List every file under a directory, skipping ignored directories."""
+        files = []
+        for dirpath, dirnames, filenames in os.walk(search_path):
+            check_cancelled()
+            dirnames[:] = [d for d in dirnames if d not in config.WORKSPACE_IGNORE_DIRS]
+            files.extend(Path(dirpath) / name for name in filenames)
+        return files
+
+    def _list_files(self, search_path: Path) -> list[Path]:
+        """List files under a directory, from cache while the watcher saw no change.
+
+        Args:
+            search_path: Directory to list
+
+        Returns:
+            Files under the directory
+        """
+        key = os.path.abspath(search_path)
+        if self.watcher is None or not self.watcher.running or not self.watcher.covers(key):
+            return self._walk(search_path)
+
+        with self._lock:
+            seq = self.watcher.seq
+            changes = self.watcher.changes_since(self._watch_seq)
+            self._watch_seq = seq
+            if changes is None:
+                self._listings.clear()
+            else:
+                for change in changes:
+                    if change.kind == MODIFIED:
+                        continue  # Content edits don't change listings
+                    for stale in [k for k in self._listings if is_under(change.path, k) or is_under(k, change.path)]:
+                        del self._listings[stale]
+            files = self._listings.get(key)
+        if files is None:
+            # Walk outside the lock; skip caching if another call consumed
+            # changes meanwhile, as they may have happened during the walk
+            files = self._walk(search_path)
+            with self._lock:
+                if self._watch_seq == seq:
+                    self._listings[key] = files
+        return files
 
     @tool
     def search_files(
@@ -32,14 +98,33 @@ class SearchTool:
         Returns:
             List of matching files
         """
-        try:
-            search_path = self.base_path / (path or ".")
-            matches = list(search_path.glob(pattern))
-            if not matches:
-                return f"No files found matching: {pattern}"
-            return "\n".join(str(m.relative_to(self.base_path)) for m in matches)
-        except Exception as e:
-            return f"Error searching for {pattern}: {e}"
+        search_path = self.base_path / (path or ".")
+
+        def search() -> str:
+            try:
+                matches = []
+                for match in search_path.glob(pattern):
+                    check_cancelled()
+                    matches.append(match)
+                if not matches:
+                    return f"No files found matching: {pattern}"
+                return get_result_store().spill(
+                    "search_files",
+                    "\n".join(str(m.relative_to(self.base_path)) for m in matches),
+                )
+            except BudgetExceeded:
+                raise
+            except Exception as e:
+                return f"Error searching for {pattern}: {e}"
+
+        return memoized(
+            self.memo,
+            "search_files",
+            {"pattern": pattern, "path": os.path.normpath(path or ".")},
+            search_path,
+            search,
+            tree=True,
+        )
 
     @tool
     def grep(
@@ -60,17 +145,19 @@ class SearchTool:
         Returns:
             Matching lines with file paths
         """
-        try:
-            search_path = self.base_path / (path or ".")
-            results = []
+        search_path = self.base_path / (path or ".")
+
+        def search() -> str:
+            try:
+                results = []
 
-            # Determine extensions to search
-            extensions = []
-            if file_type:
-                extensions = [f".{file_type}"]
+                # Determine extensions to search
+                extensions = []
+                if file_type:
+                    extensions = [f".{file_type}"]
 
-            for filepath in search_path.rglob("*"):
-                if filepath.is_file():
+                for filepath in self._list_files(search_path):
+                    check_cancelled()
                     if extensions and filepath.suffix not in extensions:
                         continue
 
@@ -86,8 +173,18 @@ class SearchTool:
                     except Exception:
                         continue
 
-            if not results:
-                return f"No matches found for: {query}"
-            return "\n".join(results[:50])  # Limit results
-        except Exception as e:
-            return f"Error searching for '{query}': {e}"
+                if not results:
+                    return f"No matches found for: {query}"
+                return get_result_store().spill("grep", "\n".join(results[:50]))  # Limit results
+            except BudgetExceeded:
+                raise
+            except Exception as e:
+                return f"Error searching for '{query}': {e}"
+
+        args = {
+            "query": query,
+            "path": os.path.normpath(path or "."),
+            "file_type": file_type,
+            "case_sensitive": case_sensitive,
+        }
+        return memoized(self.memo, "grep", args, search_path, search, tree=True)
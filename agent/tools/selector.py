@@ -0,0 +1,136 @@
+"""Per-turn tool selection.
+
+Picks the subset of tools relevant to a user message with cheap keyword
+matching, so small requests do not pay for every tool schema.
+"""
+
+import json
+import re
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Extra trigger words per tool, on top of words from its name and description
+TOOL_KEYWORDS = {
+    "read_file": {"read", "open", "show", "view", "cat", "content", "contents", "look"},
+    "write_file": {"write", "save", "create", "edit", "update", "modify", "append"},
+    "list_directory": {"list", "ls", "directory", "folder", "dir", "files", "tree"},
+    "create_directory": {"mkdir", "directory", "folder", "create"},
+    "search_files": {"find", "search", "locate", "glob", "files", "where", "which"},
+    "grep": {"grep", "search", "find", "occurrence", "mention", "usage", "contain", "contains"},
+    "summarize_text": {"summarize", "summary", "summarise", "tldr", "condense", "shorten"},
+    "extract_key_points": {"key", "points", "highlights", "takeaways", "bullet", "main"},
+    "fan_out": {"parallel", "each", "every", "subtask", "delegate", "split", "separately"},
+}
+
+# Offered with every selected subset: most requests end up reading something
+CORE_TOOLS = {"read_file", "list_directory", "search_files"}
+
+# Tools offered only alongside the listed tools (never matched by keywords)
+TOOL_COMPANIONS = {
+    "read_tool_result": {"read_file", "list_directory", "search_files", "grep"},
+}
+
+STOPWORDS = {
+    "a", "an", "the", "to", "of", "and", "or", "for", "in", "on", "with", "is",
+    "it", "as", "be", "by", "from", "args", "returns", "default", "e", "g",
+}
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> set[str]:
+    """Split text into lowercase words with naive suffix stripping.
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        Set of words
+    """
+    words = set()
+    for word in WORD_RE.findall(text.lower()):
+        if word in STOPWORDS:
+            continue
+        words.add(word)
+        for suffix in ("ing", "ed", "s"):
+            if len(word) > len(suffix) + 2 and word.endswith(suffix):
+                words.add(word[: -len(suffix)])
+                break
+    return words
+
+
+def estimate_tokens(tool: BaseTool) -> int:
+    """Rough token count of a tool's schema (4 characters per token)."""
+    return len(json.dumps(convert_to_openai_tool(tool))) // 4
+
+
+class ToolSelector:
+    """Selects relevant tools for each turn."""
+
+    def __init__(self, tools: list[BaseTool]):
+        """Initialize tool selector.
+
+        Args:
+            tools: Tools to choose from
+        """
+        self.tools = tools
+        self._keywords: dict[str, set[str]] = {}
+        self._tokens: dict[str, int] = {}
+        for tool in tools:
+            first_line = tool.description.strip().split("\n", 1)[0]
+            self._keywords[tool.name] = set() if tool.name in TOOL_COMPANIONS else (
+                tokenize(tool.name.replace("_", " "))
+                | tokenize(first_line)
+                | TOOL_KEYWORDS.get(tool.name, set())
+            )
+            self._tokens[tool.name] = estimate_tokens(tool)
+        self.full_tokens = sum(self._tokens.values())
+        self.stats: dict[str, int] = {
+            "turns": 0,
+            "fallbacks": 0,
+            "schema_tokens_sent": 0,
+            "schema_tokens_saved": 0,
+        }
+
+    def select(self, text: str) -> list[BaseTool]:
+        """Select the tools relevant to a message.
+
+        Args:
+            text: User message (optionally with recent context)
+
+        Returns:
+            Matching tools plus the core tools, in their original order, or
+            every tool when no keyword matched
+        """
+        self.stats["turns"] += 1
+        words = tokenize(text)
+        names = {t.name for t in self.tools if self._keywords[t.name] & words}
+        if names:
+            names |= CORE_TOOLS
+            for companion, producers in TOOL_COMPANIONS.items():
+                if names & producers:
+                    names.add(companion)
+            selected = [t for t in self.tools if t.name in names]
+        else:
+            # Nothing recognised: a missing tool costs more than the schemas
+            self.stats["fallbacks"] += 1
+            selected = list(self.tools)
+        sent = sum(self._tokens[t.name] for t in selected)
+        self.stats["schema_tokens_sent"] += sent
+        self.stats["schema_tokens_saved"] += self.full_tokens - sent
+        logger.info(
+            "Tool selection",
+            selected=[t.name for t in selected],
+            schema_tokens=sent,
+            schema_tokens_saved=self.full_tokens - sent,
+        )
+        return selected
+
+    def hit_rate(self) -> float:
+        """Fraction of turns that were offered a subset rather than every tool."""
+        turns = self.stats["turns"]
+        return 1.0 - self.stats["fallbacks"] / turns if turns else 1.0
+
@@ -0,0 +1,393 @@
+"""Filesystem watcher for cache and index invalidation.
+
+Watches directory trees with inotify on Linux, or by periodic stat
+polling elsewhere, and records every change in a bounded journal.
+Consumers either pull the changes since their last check with
+`changes_since` or subscribe to be called for each batch, and invalidate
+only the cache entries under changed paths instead of re-walking.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional
+import structlog
+
+import config
+
+logger = structlog.get_logger(__name__)
+
+CREATED = "created"
+MODIFIED = "modified"
+DELETED = "deleted"
+OVERFLOW = "overflow"  # Events were lost; everything under the path is suspect
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR
+)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """One change to a path."""
+
+    seq: int
+    path: str  # Absolute path
+    kind: str  # CREATED, MODIFIED, DELETED or OVERFLOW
+    is_dir: bool = False
+
+
+def is_under(path: str, directory: str) -> bool:
+    """Whether path is directory itself or inside it."""
+    return path == directory or path.startswith(directory.rstrip(os.sep) + os.sep)
+
+
+class _Inotify:
+    """Recursive inotify watches over directory trees."""
+
+    def __init__(self, ignore: set[str]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add = libc.inotify_add_watch
+        self._rm = libc.inotify_rm_watch
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.ignore = ignore
+        self.dirs: dict[int, str] = {}  # watch descriptor -> directory
+
+    def add_tree(self, root: str) -> list[str]:
+        """Watch a directory and everything below it.
+
+        Returns:
+            Files and directories found under root (for synthetic create events)
+        """
+        found = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in self.ignore]
+            wd = self._add(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, "inotify watch limit reached")
+                continue  # Removed while walking
+            self.dirs[wd] = dirpath
+            found.extend(os.path.join(dirpath, name) for name in dirnames + filenames)
+        return found
+
+    def remove_tree(self, root: str) -> None:
+        """Stop watching a directory that was moved away."""
+        for wd, path in list(self.dirs.items()):
+            if is_under(path, root):
+                self._rm(self.fd, wd)
+                del self.dirs[wd]
+
+    def read(self, timeout: float) -> list[tuple[int, int, str]]:
+        """Wait for events.
+
+        Returns:
+            List of (watch descriptor, mask, name)
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        pos = 0
+        while pos < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = os.fsdecode(data[pos:pos + length].rstrip(b"\0"))
+            pos += length
+            events.append((wd, mask, name))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """Watches directory trees and journals changes."""
+
+    def __init__(
+        self,
+        roots: Iterable[str] = (),
+        poll_interval_s: Optional[float] = None,
+        journal_size: Optional[int] = None,
+        ignore: Optional[Iterable[str]] = None,
+        use_inotify: Optional[bool] = None,
+    ):
+        """Initialize file watcher.
+
+        Args:
+            roots: Directories to watch
+            poll_interval_s: Polling period when inotify is unavailable (from config.py)
+            journal_size: Changes kept for `changes_since` (from config.py)
+            ignore: Directory names never descended into (from config.py)
+            use_inotify: Use inotify (default: on Linux)
+        """
+        self.roots = [os.path.abspath(r) for r in roots]
+        self.poll_interval_s = poll_interval_s or config.WATCH_POLL_INTERVAL_S
+        self.ignore = set(config.WORKSPACE_IGNORE_DIRS if ignore is None else ignore)
+        self.use_inotify = sys.platform.startswith("linux") if use_inotify is None else use_inotify
+        self.backend: Optional[str] = None
+
+        self._journal: deque[ChangeEvent] = deque(maxlen=journal_size or config.WATCH_JOURNAL_SIZE)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._subscribers: list[Callable[[list[ChangeEvent]], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._inotify: Optional[_Inotify] = None
+        self._snapshot: dict[str, tuple[int, int, bool]] = {}
+
+    @property
+    def seq(self) -> int:
+        """Sequence number of the latest change."""
+        return self._seq
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def covers(self, path: str) -> bool:
+        """Whether changes under an absolute path are being watched."""
+        for root in self.roots:
+            if is_under(path, root):
+                parts = os.path.relpath(path, root).split(os.sep)
+                return not any(part in self.ignore for part in parts)
+        return False
+
+    def watch(self, root: str) -> None:
+        """Add a directory tree to watch (also while running)."""
+        root = os.path.abspath(root)
+        if any(is_under(root, r) for r in self.roots):
+            return
+        self.roots.append(root)
+        if self._inotify is not None:
+            self._inotify.add_tree(root)
+        elif self.backend == "polling":
+            self._snapshot.update(self._scan(root))
+
+    def start(self) -> "FileWatcher":
+        """Start watching in a daemon thread."""
+        if self.running:
+            return self
+        if self.use_inotify:
+            try:
+                self._inotify = _Inotify(self.ignore)
+                for root in self.roots:
+                    self._inotify.add_tree(root)
+                self.backend = "inotify"
+            except OSError as e:
+                logger.warning("inotify unavailable, falling back to polling", error=str(e))
+                if self._inotify is not None:
+                    self._inotify.close()
+                    self._inotify = None
+        if self._inotify is None:
+            self.backend = "polling"
+            for root in self.roots:
+                self._snapshot.update(self._scan(root))
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="amy-watcher", daemon=True)
+        self._thread.start()
+        logger.info("Started file watcher", backend=self.backend, roots=self.roots)
+        return self
+
+    def stop(self) -> None:
+        """Stop watching."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def subscribe(self, callback: Callable[[list[ChangeEvent]], None]) -> Callable[[], None]:
+        """Call a function with each batch of changes.
+
+        Callbacks run on the watcher thread and must be quick and thread-safe.
+
+        Args:
+            callback: Receives the changes of one batch
+
+        Returns:
+            Function that removes the subscription
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def changes_since(self, seq: int) -> Optional[list[ChangeEvent]]:
+        """Changes recorded after a sequence number.
+
+        Args:
+            seq: Sequence number from a previous `seq` read
+
+        Returns:
+            Changes in order, or None if some were already dropped from the
+            journal (the caller must assume everything changed)
+        """
+        with self._lock:
+            if seq >= self._seq:
+                return []
+            if not self._journal or self._journal[0].seq > seq + 1:
+                return None
+            return [e for e in self._journal if e.seq > seq]
+
+    def _publish(self, changes: list[tuple[str, str, bool]]) -> None:
+        """Journal a batch of (path, kind, is_dir) and notify subscribers."""
+        if not changes:
+            return
+        batch = []
+        seen = set()
+        with self._lock:
+            for path, kind, is_dir in changes:
+                if (path, kind) in seen:
+                    continue
+                seen.add((path, kind))
+                self._seq += 1
+                event = ChangeEvent(seq=self._seq, path=path, kind=kind, is_dir=is_dir)
+                self._journal.append(event)
+                batch.append(event)
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(batch)
+            except Exception as e:
+                logger.error("watcher_subscriber_error", error=str(e))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self._inotify is not None:
+                    self._publish(self._read_inotify())
+                else:
+                    self._stop.wait(self.poll_interval_s)
+                    self._publish(self._poll())
+            except Exception as e:
+                # Never die silently: tell consumers to distrust their caches
+                logger.error("watcher_error", error=str(e))
+                self._publish([(root, OVERFLOW, True) for root in self.roots])
+                self._stop.wait(self.poll_interval_s)
+
+    def _read_inotify(self) -> list[tuple[str, str, bool]]:
+        inotify = self._inotify
+        changes = []
+        for wd, mask, name in inotify.read(timeout=0.5):
+            if mask & IN_Q_OVERFLOW:
+                changes.extend((root, OVERFLOW, True) for root in self.roots)
+                continue
+            if mask & IN_IGNORED:
+                inotify.dirs.pop(wd, None)
+                continue
+            directory = inotify.dirs.get(wd)
+            if directory is None or name in self.ignore:
+                continue
+            path = os.path.join(directory, name) if name else directory
+            is_dir = bool(mask & IN_ISDIR)
+
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                changes.append((path, CREATED, is_dir))
+                if is_dir:
+                    # Files may have appeared before the watch was added
+                    for found in inotify.add_tree(path):
+                        changes.append((found, CREATED, os.path.isdir(found)))
+            elif mask & (IN_DELETE | IN_MOVED_FROM | IN_DELETE_SELF):
+                changes.append((path, DELETED, is_dir or not name))
+                if is_dir and mask & IN_MOVED_FROM:
+                    inotify.remove_tree(path)
+            else:
+                changes.append((path, MODIFIED, is_dir))
+        return changes
+
+    def _scan(self, root: str) -> dict[str, tuple[int, int, bool]]:
+        """Stat every path under root: path -> (mtime_ns, size, is_dir)."""
+        snapshot = {}
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in self.ignore]
+            for name in dirnames + filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (st.st_mtime_ns, st.st_size, name in dirnames)
+        return snapshot
+
+    def _poll(self) -> list[tuple[str, str, bool]]:
+        current: dict[str, tuple[int, int, bool]] = {}
+        for root in self.roots:
+            current.update(self._scan(root))
+        changes = []
+        for path, stat in current.items():
+            old = self._snapshot.get(path)
+            if old is None:
+                changes.append((path, CREATED, stat[2]))
+            elif old != stat:
+                changes.append((path, MODIFIED, stat[2]))
+        for path, stat in self._snapshot.items():
+            if path not in current:
+                changes.append((path, DELETED, stat[2]))
+        self._snapshot = current
+        return changes
+
+
+_watcher: Optional[FileWatcher] = None
+
+
+def get_watcher() -> FileWatcher:
+    """Get the process-wide file watcher (not started until `start`)."""
+    global _watcher
+    if _watcher is None:
+        _watcher = FileWatcher()
+    return _watcher
+
+
+def workspace_watcher() -> Optional[FileWatcher]:
+    """Get the running process-wide watcher over the working directory.
+
+    Returns:
+        Started watcher, or None when watching is disabled in config.py
+    """
+    if not config.WATCH_ENABLED:
+        return None
+    watcher = get_watcher()
+    watcher.watch(os.getcwd())
+    return watcher.start()
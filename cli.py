@@ -1,8 +1,18 @@
 #!/usr/bin/env python3
 """CLI interface for Amy - Personal AI Agent."""
 
+import time
+
+_START = time.perf_counter()
+
 import asyncio
+import concurrent.futures
+import importlib
+import json
+import os
+import signal
 import sys
+import threading
 from pathlib import Path
 from typing import Optional
 import structlog
@@ -11,18 +21,336 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv(Path(__file__).parent / ".env")
 
-from agent.orchestrator import Orchestrator
+import config
 
 logger = structlog.get_logger(__name__)
 
 
+class StartupTimer:
+    """Records startup phases and heavy imports against a time budget."""
+
+    def __init__(self, start: float, enabled: bool = False):
+        """Initialize startup timer.
+
+        Args:
+            start: perf_counter() value at process start
+            enabled: Print a report when True
+        """
+        self.enabled = enabled
+        self.start = start
+        self.phases: list[tuple[str, float]] = []
+        self.imports: list[tuple[str, float]] = []
+
+    def mark(self, phase: str) -> None:
+        """Record the time elapsed since startup for a phase."""
+        self.phases.append((phase, (time.perf_counter() - self.start) * 1000))
+
+    def timed_import(self, name: str):
+        """Import a module and record how long it took.
+
+        Args:
+            name: Module name
+
+        Returns:
+            Imported module
+        """
+        t0 = time.perf_counter()
+        module = importlib.import_module(name)
+        self.imports.append((name, (time.perf_counter() - t0) * 1000))
+        return module
+
+    def report(self, phases: Optional[list[str]] = None, imports: bool = True) -> None:
+        """Print phase and import timings.
+
+        Args:
+            phases: Phases to print (default: all recorded)
+            imports: Also print heavy import timings
+        """
+        if not self.enabled:
+            return
+        print("\nStartup profile (ms since process start of cli):")
+        for phase, ms in self.phases:
+            if phases is not None and phase not in phases:
+                continue
+            flag = ""
+            if phase == "prompt" and ms > config.CLI_STARTUP_BUDGET_MS:
+                flag = f"  OVER BUDGET ({config.CLI_STARTUP_BUDGET_MS} ms)"
+            print(f"  {ms:9.1f}  {phase}{flag}")
+        for name, ms in self.imports if imports else []:
+            print(f"  {ms:9.1f}  import {name} (cumulative)")
+        print()
+
+
+timer = StartupTimer(_START, enabled=bool(os.getenv("AMY_STARTUP_PROFILE")))
+timer.mark("imports")
+
+
+def build_orchestrator():
+    """Import and construct the orchestrator.
+
+    Runs in a worker thread while the user types their first message.
+
+    Returns:
+        Orchestrator instance
+    """
+    module = timer.timed_import("agent.orchestrator")
+    orchestrator = module.Orchestrator()
+    if config.MEMORY_ARCHIVE_AFTER_DAYS:
+        orchestrator.memory.archive_episodic_memory(config.MEMORY_ARCHIVE_AFTER_DAYS)
+    timer.mark("agent ready")
+    return orchestrator
+
+
+def start_in_background(fn, name: str = "amy-agent-init") -> concurrent.futures.Future:
+    """Run a function in a daemon thread.
+
+    A daemon thread (unlike the default executor) does not hold up
+    interpreter exit, so quitting before the agent is built stays instant.
+
+    Args:
+        fn: Function to run
+        name: Thread name
+
+    Returns:
+        Future with the function's result
+    """
+    future: concurrent.futures.Future = concurrent.futures.Future()
+
+    def target() -> None:
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=target, name=name, daemon=True).start()
+    return future
+
+
+async def read_input(prompt: str) -> str:
+    """Read a line from stdin without blocking the event loop.
+
+    Background work such as memory consolidation keeps running while the
+    user is typing.
+
+    Args:
+        prompt: Prompt to show
+
+    Returns:
+        Line read
+
+    Raises:
+        EOFError: At end of input
+        KeyboardInterrupt: On Ctrl-C
+    """
+    line = asyncio.wrap_future(start_in_background(lambda: input(prompt), name="amy-input"))
+    interrupted = False
+
+    def interrupt() -> None:
+        nonlocal interrupted
+        interrupted = True
+        line.cancel()
+
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGINT, interrupt)
+    except (NotImplementedError, RuntimeError):
+        return await line
+    try:
+        return await line
+    except asyncio.CancelledError:
+        if interrupted:
+            raise KeyboardInterrupt
+        raise
+    finally:
+        loop.remove_signal_handler(signal.SIGINT)
+
+
+async def run_cancellable(orchestrator, turn):
+    """Await a turn, letting Ctrl-C cancel the turn instead of the CLI.
+
+    Args:
+        orchestrator: Orchestrator running the turn
+        turn: Turn coroutine
+
+    Returns:
+        Turn result (partial if cancelled)
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGINT, orchestrator.cancel)
+    except (NotImplementedError, RuntimeError):
+        # Signal handlers are unavailable (e.g. Windows); Ctrl-C exits as before
+        return await turn
+    try:
+        return await turn
+    finally:
+        loop.remove_signal_handler(signal.SIGINT)
+
+
+def response_text(result: dict) -> str:
+    """Text of the final message of an agent result."""
+    response = result["messages"][-1].content
+    if isinstance(response, list):
+        response = "".join(
+            c.get("text", "")
+            for c in response
+            if isinstance(c, dict)
+        )
+    return response
+
+
+def read_batch(source: str) -> list[dict]:
+    """Read batch items from a JSONL file or stdin.
+
+    Each line is a JSON string (the prompt) or an object with "prompt"
+    and optional "id" and "session_id". Malformed lines become items
+    carrying an error so they still get a result line.
+
+    Args:
+        source: Path to a JSONL file, or "-" for stdin
+
+    Returns:
+        Items as {"id", "prompt", "session_id", "error"}
+    """
+    stream = sys.stdin if source == "-" else open(source)
+    items = []
+    with stream:
+        for number, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            item = {"id": number, "prompt": None, "session_id": None, "error": None}
+            try:
+                record = json.loads(line)
+                if isinstance(record, str):
+                    record = {"prompt": record}
+                item["id"] = record.get("id", number)
+                item["prompt"] = record.get("prompt") or record.get("message")
+                item["session_id"] = record.get("session_id")
+                if not item["prompt"]:
+                    item["error"] = "missing prompt"
+            except (json.JSONDecodeError, AttributeError) as e:
+                item["error"] = f"invalid line: {e}"
+            items.append(item)
+    return items
+
+
+async def run_batch(source: str, concurrency: int) -> int:
+    """Run prompts from a JSONL source and stream JSONL results to stdout.
+
+    Items run concurrently up to `concurrency`. Items sharing a session id
+    run one after another in input order and see each other's turns as
+    conversation history. Results are printed as each item completes.
+
+    Args:
+        source: Path to a JSONL file, or "-" for stdin
+        concurrency: Maximum items running at once
+
+    Returns:
+        Number of items that failed
+    """
+    items = read_batch(source)
+    orchestrator = build_orchestrator()
+    semaphore = asyncio.Semaphore(concurrency)
+    session_locks: dict[str, asyncio.Lock] = {}
+    histories: dict[str, list[dict]] = {}
+    stopping = False
+    failed = 0
+
+    def stop() -> None:
+        nonlocal stopping
+        stopping = True
+        orchestrator.cancel()
+
+    async def run_item(item: dict) -> None:
+        nonlocal failed
+        session_id = item["session_id"]
+        lock = session_locks.setdefault(session_id, asyncio.Lock()) if session_id else None
+        record = {
+            "id": item["id"],
+            "session_id": session_id,
+            "answer": None,
+            "error": item["error"],
+            "stopped": None,
+            "timings": {},
+            "usage": None,
+        }
+        queued = time.perf_counter()
+
+        async def run() -> None:
+            if record["error"] is not None:
+                return
+            async with semaphore:
+                started = time.perf_counter()
+                record["timings"]["wait_ms"] = round((started - queued) * 1000, 1)
+                if stopping:
+                    record["error"] = "cancelled"
+                    return
+                history = histories.setdefault(session_id, []) if session_id else []
+                try:
+                    result = await orchestrator.run(
+                        message=item["prompt"],
+                        conversation_history=list(history),
+                        stream=False,
+                    )
+                    record["answer"] = response_text(result)
+                    record["stopped"] = result.get("stopped")
+                    usage = {"input_tokens": 0, "output_tokens": 0, "llm_calls": 0}
+                    for msg in result.get("messages", []):
+                        meta = getattr(msg, "usage_metadata", None)
+                        if meta:
+                            usage["llm_calls"] += 1
+                            usage["input_tokens"] += meta.get("input_tokens", 0)
+                            usage["output_tokens"] += meta.get("output_tokens", 0)
+                    record["usage"] = usage
+                    history.append({"role": "user", "content": item["prompt"]})
+                    history.append({"role": "assistant", "content": record["answer"]})
+                except Exception as e:
+                    record["error"] = str(e)
+                record["timings"]["run_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        if lock is None:
+            await run()
+        else:
+            async with lock:
+                await run()
+
+        if record["error"] is not None:
+            failed += 1
+        print(json.dumps(record, default=str), flush=True)
+
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGINT, stop)
+    except (NotImplementedError, RuntimeError):
+        pass
+
+    start = time.perf_counter()
+    try:
+        # Tasks queue on their session lock in creation (input) order
+        await asyncio.gather(*(run_item(item) for item in items))
+    finally:
+        try:
+            loop.remove_signal_handler(signal.SIGINT)
+        except (NotImplementedError, RuntimeError):
+            pass
+    logger.info(
+        "Batch finished",
+        items=len(items),
+        failed=failed,
+        concurrency=concurrency,
+        elapsed_s=round(time.perf_counter() - start, 2),
+    )
+    return failed
+
+
 def check_api_key() -> bool:
     """Check if Anthropic API key is configured.
 
     Returns:
         True if API key is available
     """
-    api_key = __import__("os").getenv("ANTHROPIC_API_KEY", "")
+    api_key = os.getenv("ANTHROPIC_API_KEY", "")
     return bool(api_key)
 
 
@@ -42,20 +370,32 @@ async def run_cli():
         print('  ANTHROPIC_API_KEY="your-api-key"')
         sys.exit(1)
 
-    # Initialize orchestrator
-    try:
-        orchestrator = Orchestrator()
-        print("Amy is ready! How can I help you today?\n")
-    except Exception as e:
-        print(f"Error initializing agent: {e}")
-        sys.exit(1)
+    # Build the orchestrator in the background while the user types
+    pending = start_in_background(build_orchestrator)
+    orchestrator = None
+
+    async def get_orchestrator():
+        nonlocal orchestrator
+        if orchestrator is None:
+            try:
+                orchestrator = await asyncio.wrap_future(pending)
+            except Exception as e:
+                print(f"Error initializing agent: {e}")
+                sys.exit(1)
+            # Built in the background, after the prompt was reported
+            timer.report(phases=["agent ready"])
+        return orchestrator
+
+    print("Amy is ready! How can I help you today?\n")
+    timer.mark("prompt")
+    timer.report(phases=["imports", "prompt"], imports=False)
 
     # Simple conversation history
     conversation = []
 
     while True:
         try:
-            user_input = input("You: ").strip()
+            user_input = (await read_input("You: ")).strip()
         except (EOFError, KeyboardInterrupt):
             print("\nGoodbye!")
             break
@@ -73,18 +413,24 @@ Available commands:
   /help     - Show this help message
   /memory   - Show current memory context
   /clear    - Clear conversation history
+  /compact  - Merge near-duplicate facts in semantic memory
   /quit     - Exit the CLI
             """)
             continue
 
         if user_input.lower() == "/memory":
-            context = orchestrator._get_memory_context()
+            context = (await get_orchestrator())._get_memory_context()
             if context:
                 print(f"\nMemory Context:\n{context}")
             else:
                 print("\nNo memory context available.")
             continue
 
+        if user_input.lower() == "/compact":
+            removed = (await get_orchestrator()).memory.compact_semantic_memory()
+            print(f"\nRemoved {removed} duplicate line(s) from semantic memory.")
+            continue
+
         if user_input.lower() == "/clear":
             conversation = []
             print("\nConversation history cleared.")
@@ -93,21 +439,16 @@ Available commands:
         # Process message
         print()
         try:
-            result = await orchestrator.run(
+            orch = await get_orchestrator()
+            result = await run_cancellable(orch, orch.run(
                 message=user_input,
                 conversation_history=conversation,
                 stream=True,
-            )
+            ))
 
             # Extract response
             if result and "messages" in result:
-                response = result["messages"][-1].content
-                if isinstance(response, list):
-                    response = "".join(
-                        c.get("text", "")
-                        for c in response
-                        if isinstance(c, dict)
-                    )
+                response = response_text(result)
 
                 print(f"Amy: {response}")
 
@@ -126,12 +467,36 @@ Available commands:
 
 def main():
     """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Amy - Personal AI Agent")
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help='Run prompts from a JSONL file ("-" for stdin) and print JSONL results',
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=config.BATCH_CONCURRENCY,
+        help="Batch items running at once",
+    )
+    args = parser.parse_args()
+
     structlog.configure(
         wrapper_class=structlog.make_filtering_bound_logger(0),
-        logger_factory=structlog.PrintLoggerFactory(),
+        # Keep stdout for results in batch mode
+        logger_factory=structlog.PrintLoggerFactory(sys.stderr if args.batch else sys.stdout),
         cache_logger_on_first_use=False,
     )
 
+    if args.batch:
+        if not check_api_key():
+            print("ERROR: ANTHROPIC_API_KEY not found in .env file.", file=sys.stderr)
+            sys.exit(1)
+        failed = asyncio.run(run_batch(args.batch, max(1, args.concurrency)))
+        sys.exit(1 if failed else 0)
+
     asyncio.run(run_cli())
 
 
@@ -5,16 +5,85 @@ API credentials (api_key, base_url) loaded from .env.
 """
 
 import os
+import tempfile
 
 # LLM Configuration
 LLM_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o")
 LLM_MAX_TOKENS = int(os.getenv("OPENAI_MAX_TOKENS", "4096"))
 LLM_TEMPERATURE = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
 
+# LLM Scheduling (process-wide quota shared by all sessions and jobs)
+LLM_REQUESTS_PER_MINUTE = int(os.getenv("AMY_LLM_RPM", "500"))
+LLM_TOKENS_PER_MINUTE = int(os.getenv("AMY_LLM_TPM", "200000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("AMY_LLM_MAX_CONCURRENCY", "16"))
+LLM_MAX_RETRIES = int(os.getenv("AMY_LLM_MAX_RETRIES", "5"))
+
+# LLM HTTP connection pool (shared by every chat model in the process)
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("AMY_LLM_HTTP_MAX_CONNECTIONS", "64"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("AMY_LLM_HTTP_MAX_KEEPALIVE", "32"))
+LLM_HTTP_KEEPALIVE_S = float(os.getenv("AMY_LLM_HTTP_KEEPALIVE_S", "60"))
+LLM_HTTP_TIMEOUT_S = float(os.getenv("AMY_LLM_HTTP_TIMEOUT_S", "600"))
+LLM_HTTP2 = os.getenv("AMY_LLM_HTTP2", "1") != "0"  # Used only when h2 is installed
+LLM_HTTP_WARMUP = os.getenv("AMY_LLM_WARMUP", "1") != "0"  # Pre-open connections at server startup
+
+# Model Routing (enabled when a fast model is configured)
+LLM_FAST_MODEL = os.getenv("OPENAI_FAST_MODEL", "")
+LLM_ROUTING_ENABLED = bool(LLM_FAST_MODEL)
+LLM_ROUTING_MIN_CONFIDENCE = float(os.getenv("AMY_ROUTING_MIN_CONFIDENCE", "0.6"))
+
+# Turn Budgets (0 disables the deadline / token limit)
+TURN_TIMEOUT_S = float(os.getenv("AMY_TURN_TIMEOUT_S", "120"))
+TURN_MAX_STEPS = int(os.getenv("AMY_TURN_MAX_STEPS", "15"))
+TURN_TOKEN_BUDGET = int(os.getenv("AMY_TURN_TOKEN_BUDGET", "0"))
+
+# Tool Configuration
+TOOL_SELECTION_ENABLED = os.getenv("AMY_TOOL_SELECTION", "1") != "0"  # Offer only matching tools per turn
+TOOL_RESULT_MAX_CHARS = int(os.getenv("AMY_TOOL_RESULT_MAX_CHARS", "8000"))  # Larger outputs are spilled
+TOOL_RESULT_DIR = os.path.join(tempfile.gettempdir(), "amy-tool-results")  # Outside the workspace
+TOOL_RESULT_TTL_S = 24 * 3600
+TOOL_MEMO_ENABLED = os.getenv("AMY_TOOL_MEMO", "1") != "0"  # Reuse unchanged read results within a turn
+
+# Workspace Watching (lets caches skip re-walks; off by default)
+WATCH_ENABLED = os.getenv("AMY_WATCH", "0") != "0"
+WATCH_POLL_INTERVAL_S = float(os.getenv("AMY_WATCH_POLL_INTERVAL_S", "2"))  # When inotify is unavailable
+WATCH_JOURNAL_SIZE = 10000  # Changes kept for consumers that check in late
+WORKSPACE_IGNORE_DIRS = {".git", "__pycache__", "node_modules", ".venv", ".mypy_cache", ".pytest_cache"}
+
 # Memory Configuration
 MEMORY_SEMANTIC_FILE = "memory/semantic_memory.md"
 MEMORY_EPISODIC_DIR = "memory/episodic"
 MEMORY_MAX_RECENT = 10
+MEMORY_USERS_DIR = "memory/users"
+# Past search_memory's 30-day window, so searches stay on plain files (0 = never)
+MEMORY_ARCHIVE_AFTER_DAYS = int(os.getenv("AMY_MEMORY_ARCHIVE_AFTER_DAYS", "45"))
+
+# Memory Consolidation (episodic turns -> semantic facts, in the background)
+# On by default only with a fast model, so background calls never default to the strong one
+CONSOLIDATION_ENABLED = os.getenv("AMY_CONSOLIDATION", "1" if LLM_FAST_MODEL else "0") != "0"
+CONSOLIDATION_MIN_TURNS = 4  # New turns needed before consolidating after a turn
+CONSOLIDATION_BATCH_TURNS = 20  # Turns per extraction call
+CONSOLIDATION_DELAY_S = 5.0  # Quiet time after a turn before consolidating
+CONSOLIDATION_IDLE_S = 300.0  # Flush leftover turns after this long without turns
+CONSOLIDATION_LOOKBACK_DAYS = 7  # History considered on the first run
+CONSOLIDATION_MAX_TURN_CHARS = 2000
+
+# Server Configuration
+SERVER_HOST = os.getenv("AMY_SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("AMY_SERVER_PORT", "8000"))
+SERVER_MAX_CONCURRENT_TURNS = int(os.getenv("AMY_MAX_CONCURRENT_TURNS", "16"))
+SERVER_MAX_QUEUED_TURNS = int(os.getenv("AMY_MAX_QUEUED_TURNS", "64"))
+SERVER_STREAM_BUFFER = 64  # Tokens buffered per stream before the agent waits
+SERVER_SESSION_TTL = 3600  # Seconds before an idle session is dropped
+
+# CLI Configuration
+BATCH_CONCURRENCY = int(os.getenv("AMY_BATCH_CONCURRENCY", "4"))  # cli.py --batch default
+CLI_STARTUP_BUDGET_MS = int(os.getenv("AMY_STARTUP_BUDGET_MS", "150"))  # Time to first prompt
+
+# Subagent Configuration
+SUBAGENT_MAX_PARALLEL = int(os.getenv("AMY_SUBAGENT_MAX_PARALLEL", "4"))
+SUBAGENT_SYSTEM_PROMPT = """You are a focused helper working on one part of a larger task.
+Complete only the task you are given and reply with a concise result.
+"""
 
 # Agent System Prompt
 AGENT_SYSTEM_PROMPT = """You are Amy, a helpful personal AI assistant.
@@ -0,0 +1,508 @@
+"""Load generator for Amy.
+
+Starts a local fake OpenAI-compatible server and drives N concurrent
+Orchestrator sessions through scripted conversations against it.
+
+Reports throughput, TTFT and end-to-end latency percentiles, and
+event-loop lag, so capacity and event-loop blocking regressions can be
+measured without touching a real API.
+"""
+
+import asyncio
+import json
+import math
+import tempfile
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+import config
+
+
+DEFAULT_SCRIPT = [
+    "Hi Amy, what can you do?",
+    "List the files in the current directory",
+    "Summarize what we talked about",
+]
+
+
+@dataclass
+class FakeServerConfig:
+    """Behaviour of the fake OpenAI-compatible server."""
+
+    latency_ms: float = 200.0
+    tokens_per_sec: float = 50.0
+    response_tokens: int = 40
+    # Scripted tool calls: [{"match": str, "name": str, "arguments": dict}]
+    tool_calls: list[dict] = field(default_factory=list)
+
+
+class FakeOpenAIServer:
+    """Minimal OpenAI-compatible chat completions server.
+
+    Runs on its own event loop in a background thread so that its work
+    does not show up as event-loop lag on the client side.
+    """
+
+    def __init__(self, cfg: FakeServerConfig, host: str = "127.0.0.1", port: int = 0):
+        """Initialize fake server.
+
+        Args:
+            cfg: Server behaviour configuration
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+        """
+        self.cfg = cfg
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+
+    @property
+    def base_url(self) -> str:
+        """OpenAI-compatible base URL of the running server."""
+        return f"http://{self.host}:{self.port}/v1"
+
+    def start(self) -> None:
+        """Start the server in a background thread."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self) -> None:
+        """Stop the server and join its thread."""
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.host, self.port)
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._server.close()
+            pending = asyncio.all_tasks(self._loop)
+            for task in pending:
+                task.cancel()
+            self._loop.run_until_complete(
+                asyncio.gather(*pending, return_exceptions=True)
+            )
+            self._loop.close()
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve HTTP/1.1 requests on one keep-alive connection."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", "0"))
+                body = await reader.readexactly(length) if length else b""
+
+                if method == "POST" and path.rstrip("/").endswith("/chat/completions"):
+                    self.requests += 1
+                    await self._chat_completion(json.loads(body or b"{}"), writer)
+                else:
+                    await self._send_json(writer, 404, {"error": {"message": "not found"}})
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _plan_response(self, request: dict) -> tuple[Optional[dict], str]:
+        """Decide whether to answer with a tool call or with text.
+
+        Returns:
+            Tuple of (tool call or None, text content)
+        """
+        messages = request.get("messages", [])
+        last = messages[-1] if messages else {}
+        if last.get("role") == "user":
+            text = str(last.get("content", ""))
+            for rule in self.cfg.tool_calls:
+                if rule.get("match", "").lower() in text.lower():
+                    return {
+                        "id": f"call_{uuid.uuid4().hex[:12]}",
+                        "type": "function",
+                        "function": {
+                            "name": rule["name"],
+                            "arguments": json.dumps(rule.get("arguments", {})),
+                        },
+                    }, ""
+        words = ["lorem", "ipsum", "dolor", "sit", "amet"]
+        tokens = [words[i % len(words)] for i in range(self.cfg.response_tokens)]
+        return None, " ".join(tokens)
+
+    async def _chat_completion(self, request: dict, writer: asyncio.StreamWriter) -> None:
+        tool_call, text = self._plan_response(request)
+        model = request.get("model", "fake")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        n_tokens = 1 if tool_call else self.cfg.response_tokens
+        usage = {
+            "prompt_tokens": len(json.dumps(request.get("messages", []))) // 4,
+            "completion_tokens": n_tokens,
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        finish_reason = "tool_calls" if tool_call else "stop"
+        token_delay = 1.0 / self.cfg.tokens_per_sec if self.cfg.tokens_per_sec > 0 else 0.0
+
+        await asyncio.sleep(self.cfg.latency_ms / 1000)
+
+        if not request.get("stream"):
+            await asyncio.sleep(token_delay * n_tokens)
+            message: dict[str, Any] = {"role": "assistant", "content": text or None}
+            if tool_call:
+                message["tool_calls"] = [tool_call]
+            await self._send_json(writer, 200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+                "usage": usage,
+            })
+            return
+
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+
+        async def event(payload: Any) -> None:
+            data = payload if isinstance(payload, str) else json.dumps(payload)
+            chunk = f"data: {data}\n\n".encode()
+            writer.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            await writer.drain()
+
+        def chunk(delta: dict, finish: Optional[str] = None) -> dict:
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+
+        if tool_call:
+            await event(chunk({"role": "assistant", "tool_calls": [dict(tool_call, index=0)]}))
+        else:
+            for i, token in enumerate(text.split(" ")):
+                delta = {"content": token if i == 0 else f" {token}"}
+                if i == 0:
+                    delta["role"] = "assistant"
+                await event(chunk(delta))
+                await asyncio.sleep(token_delay)
+        await event(chunk({}, finish_reason))
+        if request.get("stream_options", {}).get("include_usage"):
+            await event(dict(chunk({}), choices=[], usage=usage))
+        await event("[DONE]")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        reason = "OK" if status == 200 else "Not Found"
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag by timing a periodic sleep."""
+
+    def __init__(self, interval: float = 0.01):
+        """Initialize monitor.
+
+        Args:
+            interval: Sampling interval in seconds
+        """
+        self.interval = interval
+        self.samples: list[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start sampling on the running loop."""
+        self._task = asyncio.create_task(self._sample())
+
+    async def stop(self) -> None:
+        """Stop sampling."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, loop.time() - start - self.interval))
+
+
+@dataclass
+class TurnResult:
+    """Timing of one scripted turn."""
+
+    session: int
+    ttft: Optional[float]
+    latency: float
+    chunks: int
+    error: Optional[str] = None
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile.
+
+    Args:
+        values: Sample values
+        pct: Percentile in [0, 100]
+
+    Returns:
+        Percentile value (0.0 for no samples)
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_session(
+    session: int,
+    orchestrator: Any,
+    script: list[str],
+    think_time: float,
+    results: list[TurnResult],
+) -> None:
+    """Drive one session through the scripted conversation.
+
+    Each turn sees the session's earlier turns as conversation history.
+
+    Args:
+        session: Session number
+        orchestrator: Orchestrator instance for this session
+        script: User messages to send in order
+        think_time: Delay between turns in seconds
+        results: List to append turn results to
+    """
+    history: list[dict] = []
+    for message in script:
+        start = time.perf_counter()
+        ttft = None
+        chunks = 0
+        error = None
+        parts = []
+        try:
+            async for token in orchestrator.stream(message, list(history)):
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                chunks += 1
+                if isinstance(token, str):
+                    parts.append(token)
+        except Exception as e:
+            error = str(e)
+        history.append({"role": "user", "content": message})
+        history.append({"role": "assistant", "content": "".join(parts)})
+        results.append(TurnResult(
+            session=session,
+            ttft=ttft,
+            latency=time.perf_counter() - start,
+            chunks=chunks,
+            error=error,
+        ))
+        if think_time:
+            await asyncio.sleep(think_time)
+
+
+async def run_load_test(
+    sessions: int = 10,
+    script: Optional[list[str]] = None,
+    server_config: Optional[FakeServerConfig] = None,
+    think_time: float = 0.0,
+    warm_up: bool = False,
+    rpm: int = 0,
+    tpm: int = 0,
+    max_concurrency: int = 0,
+) -> dict:
+    """Run the load test and return a report.
+
+    The LLM scheduler is replaced for the run so the report measures the
+    agent rather than the production quota; limits default to none.
+
+    Args:
+        sessions: Number of concurrent sessions
+        script: User messages per session (default: built-in script)
+        server_config: Fake server behaviour
+        think_time: Delay between turns in seconds
+        warm_up: Pre-open pooled LLM connections before the sessions start
+        rpm: LLM requests per minute (0 = unlimited)
+        tpm: LLM tokens per minute (0 = unlimited)
+        max_concurrency: LLM calls in flight (0 = one per session)
+
+    Returns:
+        Report dictionary with throughput, latency and lag statistics
+    """
+    script = script or DEFAULT_SCRIPT
+    server = FakeOpenAIServer(server_config or FakeServerConfig())
+    server.start()
+
+    from agent.http_client import get_http_pool
+    from agent.orchestrator import Orchestrator
+    from agent.scheduler import LLMScheduler, set_scheduler
+
+    limits = {"rpm": rpm, "tpm": tpm, "max_concurrency": max_concurrency or sessions}
+    scheduler = LLMScheduler(
+        requests_per_minute=rpm,
+        tokens_per_minute=tpm,
+        max_concurrency=limits["max_concurrency"],
+    )
+    previous_scheduler = set_scheduler(scheduler)
+
+    # Keep load-test memory out of the real memory directory
+    memory_paths = (config.MEMORY_SEMANTIC_FILE, config.MEMORY_EPISODIC_DIR)
+    workdir = tempfile.mkdtemp(prefix="amy-loadtest-")
+    config.MEMORY_SEMANTIC_FILE = str(Path(workdir) / "semantic_memory.md")
+    config.MEMORY_EPISODIC_DIR = str(Path(workdir) / "episodic")
+
+    results: list[TurnResult] = []
+    monitor = LoopLagMonitor()
+    start = time.perf_counter()
+    try:
+        orchestrators = [
+            Orchestrator(api_key="loadtest", base_url=server.base_url, consolidate=False)
+            for _ in range(sessions)
+        ]
+
+        if warm_up:
+            await get_http_pool().warm_up(server.base_url, connections=min(sessions, config.LLM_HTTP_MAX_KEEPALIVE))
+
+        monitor.start()
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            run_session(i, orch, script, think_time, results)
+            for i, orch in enumerate(orchestrators)
+        ))
+    finally:
+        elapsed = time.perf_counter() - start
+        await monitor.stop()
+        server.stop()
+        set_scheduler(previous_scheduler)
+        config.MEMORY_SEMANTIC_FILE, config.MEMORY_EPISODIC_DIR = memory_paths
+
+    ok = [r for r in results if r.error is None]
+    ttfts = [r.ttft for r in ok if r.ttft is not None]
+    latencies = [r.latency for r in ok]
+    lags = monitor.samples
+
+    def summary(values: list[float]) -> dict:
+        return {
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p90_ms": round(percentile(values, 90) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+            "max_ms": round(max(values, default=0.0) * 1000, 1),
+        }
+
+    return {
+        "sessions": sessions,
+        "turns": len(results),
+        "errors": len(results) - len(ok),
+        "llm_requests": server.requests,
+        "elapsed_s": round(elapsed, 3),
+        "turns_per_s": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "chunks_per_s": round(sum(r.chunks for r in ok) / elapsed, 1) if elapsed else 0.0,
+        "ttft": summary(ttfts),
+        "latency": summary(latencies),
+        "loop_lag": summary(lags),
+        "llm_limits": limits,
+        "llm_scheduler": scheduler.metrics(),
+        "llm_http": get_http_pool().metrics(),
+    }
+
+
+def main():
+    """Main entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load test Amy against a fake LLM server")
+    parser.add_argument("--sessions", "-n", type=int, default=10, help="Concurrent sessions")
+    parser.add_argument(
+        "--script",
+        help="JSON file with a list of user messages per session",
+    )
+    parser.add_argument(
+        "--tool-calls",
+        help='JSON file with scripted tool calls: [{"match", "name", "arguments"}]',
+    )
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Time to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0, help="Streaming token rate")
+    parser.add_argument("--response-tokens", type=int, default=40, help="Tokens per text reply")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Seconds between turns")
+    parser.add_argument("--warm-up", action="store_true", help="Pre-open LLM connections first")
+    parser.add_argument("--rpm", type=int, default=0, help="LLM requests per minute (0 = unlimited)")
+    parser.add_argument("--tpm", type=int, default=0, help="LLM tokens per minute (0 = unlimited)")
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=0,
+        help="LLM calls in flight (0 = one per session)",
+    )
+
+    args = parser.parse_args()
+
+    script = json.loads(Path(args.script).read_text()) if args.script else None
+    tool_calls = json.loads(Path(args.tool_calls).read_text()) if args.tool_calls else []
+
+    report = asyncio.run(run_load_test(
+        sessions=args.sessions,
+        script=script,
+        server_config=FakeServerConfig(
+            latency_ms=args.latency_ms,
+            tokens_per_sec=args.tokens_per_sec,
+            response_tokens=args.response_tokens,
+            tool_calls=tool_calls,
+        ),
+        think_time=args.think_time,
+        warm_up=args.warm_up,
+        rpm=args.rpm,
+        tpm=args.tpm,
+        max_concurrency=args.max_concurrency,
+    ))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,482 @@
+#!/usr/bin/env python3
+"""HTTP/WebSocket server for Amy - Personal AI Agent.
+
+Serves many sessions from one process. All sessions share one LLM client
+and one compiled tool set; each session keeps its own conversation
+history, and each user gets their own memory directory.
+
+Endpoints:
+    POST   /sessions                       Create a session ({"user_id": ...})
+    POST   /sessions/{session_id}/messages Send a message ({"message", "stream"})
+    DELETE /sessions/{session_id}          Drop a session
+    WS     /sessions/{session_id}/ws       Send messages, receive token events
+    GET    /health                         Load and session statistics
+"""
+
+import asyncio
+import json
+import re
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+import structlog
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route, WebSocketRoute
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+# Load environment variables from .env file
+load_dotenv(Path(__file__).parent / ".env")
+
+import config
+from agent.http_client import get_http_pool
+from agent.llm import create_chat_model
+from agent.memory import MemorySystem
+from agent.orchestrator import Orchestrator
+from agent.watcher import workspace_watcher
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+logger = structlog.get_logger(__name__)
+
+# Dot-only ids ("." / "..") would resolve outside memory/users
+USER_ID_PATTERN = re.compile(r"^(?!\.+$)[A-Za-z0-9_.-]{1,64}$")
+
+
+def user_memory_dir(user_id: str) -> Path:
+    """Memory directory of a user.
+
+    Args:
+        user_id: User identifier
+
+    Returns:
+        Resolved directory directly under config.MEMORY_USERS_DIR
+
+    Raises:
+        ValueError: If the id is malformed or resolves elsewhere
+    """
+    users_dir = Path(config.MEMORY_USERS_DIR).resolve()
+    user_dir = (users_dir / user_id).resolve()
+    if not USER_ID_PATTERN.match(user_id) or user_dir.parent != users_dir:
+        raise ValueError(f"Invalid user_id: {user_id}")
+    return user_dir
+
+
+class Overloaded(Exception):
+    """Raised when the turn queue is full."""
+
+
+class TurnLimiter:
+    """Caps concurrent agent turns and bounds the number of waiting turns."""
+
+    def __init__(self, max_concurrent: int, max_queued: int):
+        """Initialize limiter.
+
+        Args:
+            max_concurrent: Maximum turns running at once
+            max_queued: Maximum turns waiting for a slot
+        """
+        self.max_queued = max_queued
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a turn slot for the duration of the block.
+
+        Raises:
+            Overloaded: If too many turns are already waiting
+        """
+        if self._semaphore.locked() and self.waiting >= self.max_queued:
+            raise Overloaded()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+
+@dataclass
+class Session:
+    """Conversation state for one client session."""
+
+    session_id: str
+    user_id: str
+    history: list[BaseMessage] = field(default_factory=list)
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class SessionManager:
+    """Owns shared resources, per-user orchestrators and sessions."""
+
+    def __init__(self):
+        """Initialize session manager with a shared LLM client."""
+        self.llm = create_chat_model()
+        self.fast_llm = (
+            create_chat_model(model=config.LLM_FAST_MODEL)
+            if config.LLM_ROUTING_ENABLED else None
+        )
+        self.limiter = TurnLimiter(
+            config.SERVER_MAX_CONCURRENT_TURNS, config.SERVER_MAX_QUEUED_TURNS
+        )
+        self.sessions: dict[str, Session] = {}
+        self._orchestrators: dict[str, Orchestrator] = {}
+        self._building: dict[str, asyncio.Task] = {}
+        self._turns: dict[str, int] = {}  # Running turns per user
+
+    def _build_orchestrator(self, user_id: str) -> Orchestrator:
+        """Build the orchestrator for a user (blocking; run off the event loop)."""
+        user_dir = user_memory_dir(user_id)
+        memory = MemorySystem(
+            semantic_file=str(user_dir / "semantic_memory.md"),
+            episodic_dir=str(user_dir / "episodic"),
+            watcher=workspace_watcher(),
+        )
+        if config.MEMORY_ARCHIVE_AFTER_DAYS:
+            memory.archive_episodic_memory(config.MEMORY_ARCHIVE_AFTER_DAYS)
+        return Orchestrator(llm=self.llm, memory=memory, fast_llm=self.fast_llm)
+
+    async def orchestrator_for(self, user_id: str) -> Orchestrator:
+        """Get or create the orchestrator for a user.
+
+        Building compiles the agent graph and touches the user's memory
+        files, so it runs in a worker thread; concurrent first turns of
+        one user share a single build.
+
+        Args:
+            user_id: User identifier
+
+        Returns:
+            Orchestrator using the shared LLM and the user's memory
+
+        Raises:
+            ValueError: If the user's memory directory would fall outside
+                config.MEMORY_USERS_DIR
+        """
+        orchestrator = self._orchestrators.get(user_id)
+        if orchestrator is not None:
+            return orchestrator
+        build = self._building.get(user_id)
+        if build is None:
+            build = asyncio.create_task(asyncio.to_thread(self._build_orchestrator, user_id))
+            self._building[user_id] = build
+            build.add_done_callback(lambda _: self._building.pop(user_id, None))
+        orchestrator = await asyncio.shield(build)
+        return self._orchestrators.setdefault(user_id, orchestrator)
+
+    async def evict_idle(self) -> None:
+        """Close orchestrators of users with no live session or running turn."""
+        live = {s.user_id for s in self.sessions.values()}
+        live.update(user_id for user_id, count in self._turns.items() if count)
+        for user_id in [u for u in self._orchestrators if u not in live]:
+            orchestrator = self._orchestrators.pop(user_id)
+            await orchestrator.aclose()
+            logger.info("Orchestrator evicted", user_id=user_id)
+
+    async def aclose(self) -> None:
+        """Close every orchestrator."""
+        orchestrators = list(self._orchestrators.values())
+        self._orchestrators.clear()
+        for orchestrator in orchestrators:
+            await orchestrator.aclose()
+
+    async def create(self, user_id: str) -> Session:
+        """Create a new session.
+
+        Args:
+            user_id: User identifier
+
+        Returns:
+            New session
+
+        Raises:
+            ValueError: If the user id does not map to a directory under
+                config.MEMORY_USERS_DIR
+        """
+        user_memory_dir(user_id)
+        await self.prune()
+        session = Session(session_id=uuid.uuid4().hex, user_id=user_id)
+        self.sessions[session.session_id] = session
+        logger.info("Session created", session_id=session.session_id, user_id=user_id)
+        return session
+
+    def get(self, session_id: str) -> Optional[Session]:
+        """Look up a session.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            Session or None if unknown
+        """
+        return self.sessions.get(session_id)
+
+    async def drop(self, session_id: str) -> bool:
+        """Remove a session.
+
+        Args:
+            session_id: Session identifier
+
+        Returns:
+            True if the session existed
+        """
+        existed = self.sessions.pop(session_id, None) is not None
+        await self.evict_idle()
+        return existed
+
+    async def prune(self) -> None:
+        """Drop sessions idle for longer than the configured TTL.
+
+        Orchestrators of users left without sessions are closed with them.
+        """
+        cutoff = time.monotonic() - config.SERVER_SESSION_TTL
+        for session_id, session in list(self.sessions.items()):
+            if session.last_used < cutoff and not session.lock.locked():
+                del self.sessions[session_id]
+        await self.evict_idle()
+
+    async def run_turn(self, session: Session, message: str) -> AsyncIterator[str]:
+        """Run one turn and yield response tokens.
+
+        Turns in the same session run one at a time; turns across sessions
+        are capped by the shared limiter.
+
+        Args:
+            session: Session to run in
+            message: User message
+
+        Yields:
+            Response tokens
+        """
+        user_id = session.user_id
+        self._turns[user_id] = self._turns.get(user_id, 0) + 1
+        try:
+            orchestrator = await self.orchestrator_for(user_id)
+            async with self.limiter.slot(), session.lock:
+                session.last_used = time.monotonic()
+                parts = []
+                async for token in orchestrator.stream(message, session.history):
+                    if isinstance(token, str):
+                        parts.append(token)
+                    yield token
+                session.history.append(HumanMessage(content=message))
+                session.history.append(AIMessage(content="".join(parts)))
+                session.last_used = time.monotonic()
+        finally:
+            self._turns[user_id] -= 1
+            if not self._turns[user_id]:
+                del self._turns[user_id]
+
+    async def buffered_turn(self, session: Session, message: str) -> AsyncIterator[str]:
+        """Run a turn through a bounded buffer.
+
+        The agent pauses once the buffer is full, so a slow client cannot make
+        the server hold an unbounded amount of output.
+
+        Args:
+            session: Session to run in
+            message: User message
+
+        Yields:
+            Response tokens
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=config.SERVER_STREAM_BUFFER)
+        done = object()
+
+        async def produce() -> None:
+            try:
+                async for token in self.run_turn(session, message):
+                    await queue.put(token)
+                await queue.put(done)
+            except Exception as e:
+                await queue.put(e)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if not producer.done():
+                producer.cancel()
+
+
+manager: Optional[SessionManager] = None
+
+
+def get_manager() -> SessionManager:
+    """Get the process-wide session manager."""
+    global manager
+    if manager is None:
+        manager = SessionManager()
+    return manager
+
+
+def error(status: int, message: str, **headers: str) -> JSONResponse:
+    """Build a JSON error response."""
+    return JSONResponse({"error": message}, status_code=status, headers=headers or None)
+
+
+async def create_session(request: Request) -> JSONResponse:
+    """Create a session for a user."""
+    try:
+        body = await request.json() if await request.body() else {}
+    except ValueError:
+        return error(400, "Invalid JSON body")
+    if not isinstance(body, dict):
+        return error(400, "Invalid JSON body")
+    user_id = str(body.get("user_id", "default"))
+    if not USER_ID_PATTERN.match(user_id):
+        return error(400, "Invalid user_id")
+    try:
+        session = await get_manager().create(user_id)
+    except ValueError:
+        return error(400, "Invalid user_id")
+    return JSONResponse({"session_id": session.session_id, "user_id": user_id})
+
+
+async def delete_session(request: Request) -> JSONResponse:
+    """Drop a session."""
+    if not await get_manager().drop(request.path_params["session_id"]):
+        return error(404, "Unknown session")
+    return JSONResponse({"deleted": True})
+
+
+async def post_message(request: Request):
+    """Send a message; answer as JSON or as a server-sent event stream."""
+    mgr = get_manager()
+    session = mgr.get(request.path_params["session_id"])
+    if session is None:
+        return error(404, "Unknown session")
+
+    try:
+        body = await request.json()
+    except ValueError:
+        return error(400, "Invalid JSON body")
+    if not isinstance(body, dict):
+        return error(400, "Invalid JSON body")
+    message = str(body.get("message", "")).strip()
+    if not message:
+        return error(400, "Empty message")
+
+    if mgr.limiter.waiting >= mgr.limiter.max_queued:
+        return error(503, "Server busy", **{"Retry-After": "1"})
+
+    if not body.get("stream", True):
+        try:
+            answer = "".join([t async for t in mgr.run_turn(session, message) if isinstance(t, str)])
+        except Overloaded:
+            return error(503, "Server busy", **{"Retry-After": "1"})
+        return JSONResponse({"answer": answer})
+
+    async def events() -> AsyncIterator[str]:
+        try:
+            async for token in mgr.buffered_turn(session, message):
+                yield f"data: {json.dumps({'type': 'token', 'content': token})}\n\n"
+            yield f"data: {json.dumps({'type': 'done'})}\n\n"
+        except Overloaded:
+            yield f"data: {json.dumps({'type': 'error', 'error': 'Server busy'})}\n\n"
+        except Exception as e:
+            logger.error("turn_error", session_id=session.session_id, error=str(e))
+            yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+async def session_socket(websocket: WebSocket) -> None:
+    """Exchange messages and token events over a WebSocket."""
+    mgr = get_manager()
+    session = mgr.get(websocket.path_params["session_id"])
+    await websocket.accept()
+    if session is None:
+        await websocket.send_json({"type": "error", "error": "Unknown session"})
+        await websocket.close(code=4404)
+        return
+
+    try:
+        while True:
+            data = await websocket.receive_json()
+            message = str(data.get("message", "")).strip()
+            if not message:
+                continue
+            try:
+                async for token in mgr.buffered_turn(session, message):
+                    await websocket.send_json({"type": "token", "content": token})
+                await websocket.send_json({"type": "done"})
+            except Overloaded:
+                await websocket.send_json({"type": "error", "error": "Server busy"})
+            except WebSocketDisconnect:
+                raise
+            except Exception as e:
+                logger.error("turn_error", session_id=session.session_id, error=str(e))
+                await websocket.send_json({"type": "error", "error": str(e)})
+    except WebSocketDisconnect:
+        pass
+
+
+async def health(request: Request) -> JSONResponse:
+    """Report load and session statistics."""
+    mgr = get_manager()
+    return JSONResponse({
+        "status": "ok",
+        "sessions": len(mgr.sessions),
+        "active_turns": mgr.limiter.active,
+        "queued_turns": mgr.limiter.waiting,
+        "llm_http": get_http_pool().metrics(),
+    })
+
+
+@asynccontextmanager
+async def lifespan(app: Starlette) -> AsyncIterator[None]:
+    """Open LLM connections at startup; close orchestrators and the pool at shutdown."""
+    if config.LLM_HTTP_WARMUP:
+        await get_http_pool().warm_up(connections=min(4, config.LLM_HTTP_MAX_KEEPALIVE))
+    try:
+        yield
+    finally:
+        if manager is not None:
+            await manager.aclose()
+        await get_http_pool().aclose()
+
+
+app = Starlette(routes=[
+    Route("/health", health, methods=["GET"]),
+    Route("/sessions", create_session, methods=["POST"]),
+    Route("/sessions/{session_id}", delete_session, methods=["DELETE"]),
+    Route("/sessions/{session_id}/messages", post_message, methods=["POST"]),
+    WebSocketRoute("/sessions/{session_id}/ws", session_socket),
+], lifespan=lifespan)
+
+
+def main():
+    """Main entry point."""
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Amy HTTP/WebSocket server")
+    parser.add_argument("--host", default=config.SERVER_HOST, help="Interface to bind")
+    parser.add_argument("--port", type=int, default=config.SERVER_PORT, help="Port to bind")
+    args = parser.parse_args()
+
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
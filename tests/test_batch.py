@@ -0,0 +1,51 @@
+"""Tests for batch mode against a fake OpenAI-compatible server."""
+
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("langchain_openai")
+
+import cli
+import config
+from agent.http_client import get_http_pool
+from loadtest import FakeOpenAIServer, FakeServerConfig
+
+
+@pytest.fixture
+def fake_llm(monkeypatch, tmp_path):
+    server = FakeOpenAIServer(FakeServerConfig(latency_ms=1, tokens_per_sec=5000, response_tokens=12))
+    server.start()
+    monkeypatch.setenv("OPENAI_BASE_URL", server.base_url)
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(config, "MEMORY_SEMANTIC_FILE", str(tmp_path / "semantic_memory.md"))
+    monkeypatch.setattr(config, "MEMORY_EPISODIC_DIR", str(tmp_path / "episodic"))
+    monkeypatch.setattr(config, "CONSOLIDATION_ENABLED", False)
+    yield server
+    server.stop()
+
+
+def test_batch_reports_usage(fake_llm, tmp_path, capsys):
+    source = tmp_path / "batch.jsonl"
+    source.write_text(
+        json.dumps({"id": "a", "prompt": "Hello"}) + "\n"
+        + json.dumps({"id": "b", "prompt": "How are you?"}) + "\n"
+    )
+
+    async def run() -> int:
+        try:
+            return await cli.run_batch(str(source), concurrency=2)
+        finally:
+            await get_http_pool().aclose()
+
+    assert asyncio.run(run()) == 0
+    # Log lines share stdout here; batch mode moves them to stderr in main()
+    out = capsys.readouterr().out.splitlines()
+    records = [json.loads(line) for line in out if line.startswith("{")]
+    assert sorted(r["id"] for r in records) == ["a", "b"]
+    for record in records:
+        assert record["answer"]
+        assert record["usage"]["llm_calls"] >= 1
+        assert record["usage"]["input_tokens"] > 0
+        assert record["usage"]["output_tokens"] > 0
@@ -0,0 +1,70 @@
+"""Tests for semantic memory near-duplicate detection."""
+
+import pytest
+
+from agent.dedup import SignatureIndex, dedup_lines, fact_terms, similarity
+
+RESTATEMENTS = [
+    ("Remember I prefer dark mode", "I prefer dark mode"),
+    ("Prefers dark mode", "Prefers dark mode in the editor"),
+    ("User prefers dark mode", "Remember that I prefer dark mode"),
+    ("Likes green tea", "Liked green tea"),
+]
+
+DISTINCT = [
+    ("Has a dog named Rex", "Has a cat named Rex"),
+    ("Works on project Apollo", "Works on project Zeus"),
+    ("Lives in Berlin", "Lives in Paris"),
+    ("Prefers dark mode", "Prefers light mode"),
+]
+
+
+@pytest.mark.parametrize("a, b", RESTATEMENTS)
+def test_restatements_merge(a, b):
+    lines, removed = dedup_lines([f"- {a}", f"- {b}"])
+    assert removed == 1
+    assert lines == [f"- {b}"]
+
+
+@pytest.mark.parametrize("a, b", DISTINCT)
+def test_distinct_facts_kept(a, b):
+    lines, removed = dedup_lines([f"- {a}", f"- {b}"])
+    assert removed == 0
+    assert len(lines) == 2
+
+
+def test_four_restatements_compact_to_one():
+    lines = [
+        "## Preferences",
+        "- Remember I prefer dark mode",
+        "- I prefer dark mode",
+        "- Prefers dark mode",
+        "- Prefers dark mode in the editor",
+        "- Works on project Apollo",
+    ]
+    kept, removed = dedup_lines(lines)
+    assert removed == 3
+    assert kept == [
+        "## Preferences",
+        "- Prefers dark mode in the editor",
+        "- Works on project Apollo",
+    ]
+
+
+def test_markup_and_inflection_ignored():
+    assert similarity(fact_terms("- **Prefers** `dark` mode"), fact_terms("preferred dark modes")) == 1.0
+
+
+def test_index_finds_restatement(tmp_path):
+    source = tmp_path / "semantic_memory.md"
+    source.write_text("- I prefer dark mode\n- Works on project Apollo\n")
+    index = SignatureIndex(tmp_path / "semantic_memory.sigs.json")
+    index.load(source, source.read_text().split("\n"))
+
+    assert index.find(fact_terms("Remember I prefer dark mode")) is not None
+    assert index.find(fact_terms("Works on project Zeus")) is None
+
+    # A fresh index reads the persisted word sets
+    reloaded = SignatureIndex(tmp_path / "semantic_memory.sigs.json")
+    reloaded.load(source, [])
+    assert reloaded.signatures == index.signatures
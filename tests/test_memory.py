@@ -0,0 +1,60 @@
+"""Tests for episodic memory archiving."""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+
+pytest.importorskip("structlog")
+
+from agent.memory import MemorySystem
+
+
+def turn(d: date, role: str, content: str) -> str:
+    return f"### [{datetime.combine(d, datetime.min.time()).isoformat()}] {role}\n\n{content}"
+
+
+@pytest.fixture
+def memory(tmp_path):
+    memory = MemorySystem(
+        semantic_file=str(tmp_path / "semantic_memory.md"),
+        episodic_dir=str(tmp_path / "episodic"),
+    )
+    today = date.today()
+    memory.write_episodic_memory(turn(today - timedelta(days=10), "USER", "Booked the ferry"),
+                                 d=today - timedelta(days=10))
+    memory.write_episodic_memory(turn(today - timedelta(days=2), "USER", "Asked about trains"),
+                                 d=today - timedelta(days=2))
+    return memory
+
+
+def test_construction_does_not_archive(memory, tmp_path):
+    old = memory.episodic_dir / f"{(date.today() - timedelta(days=10)).isoformat()}.md"
+    MemorySystem(
+        semantic_file=str(tmp_path / "semantic_memory.md"),
+        episodic_dir=str(tmp_path / "episodic"),
+    )
+    assert old.exists()
+
+
+def test_archived_days_read_transparently(memory):
+    old_day = date.today() - timedelta(days=10)
+    before = memory.read_episodic_memory(old_day)
+
+    assert memory.archive_episodic_memory(older_than_days=5) == 1
+    assert not (memory.episodic_dir / f"{old_day.isoformat()}.md").exists()
+    assert (memory.episodic_dir / f"{date.today() - timedelta(days=2)}.md").exists()
+
+    assert memory.read_episodic_memory(old_day) == before
+    assert [r.splitlines()[0] for r in memory.search_memory("ferry")] == [f"## {old_day.isoformat()}"]
+    turns = memory.get_turns(datetime.combine(old_day, datetime.min.time()), datetime.now())
+    assert [t["content"] for t in turns] == ["Booked the ferry", "Asked about trains"]
+
+
+def test_rewritten_archived_day_keeps_both_parts(memory):
+    old_day = date.today() - timedelta(days=10)
+    memory.archive_episodic_memory(older_than_days=5)
+    memory.write_episodic_memory(turn(old_day, "ASSISTANT", "Ferry leaves at 9"), d=old_day)
+    memory.archive_episodic_memory(older_than_days=5)
+
+    content = memory.read_episodic_memory(old_day)
+    assert "Booked the ferry" in content and "Ferry leaves at 9" in content
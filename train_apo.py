@@ -1,23 +1,62 @@
 """APO (Automatic Prompt Optimization) training script.
 
-Uses Agent Lightning to optimize the orchestrator's system prompt.
+Optimizes the orchestrator's system prompt with an APO-style loop: score
+the current prompt on the training tasks, critique its failures, propose
+rewrites and keep the best candidate.
+
+Rollouts run in a bounded-concurrency pool, evaluations are memoized by
+a hash of (prompt, task), and every iteration is checkpointed so that
+`--resume` continues an interrupted run.
 """
 
 import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
 from pathlib import Path
 from typing import Optional
 import config
 
-# Try to import agentlightning
-try:
-    from agentlightning.algorithm.apo import APO
-    from agentlightning.algorithm.apo.config import APOConfig
-    AGENT_LIGHTNING_AVAILABLE = True
-except ImportError:
-    AGENT_LIGHTNING_AVAILABLE = False
-    print("Warning: agentlightning not installed. Run: pip install agentlightning[apo]")
-
+from agent.llm import create_chat_model
+from agent.memory import MemorySystem
 from agent.orchestrator import Orchestrator
+from agent.scheduler import BATCH
+
+
+JUDGE_PROMPT = """You grade an AI assistant's reply.
+
+Task: {task}
+Expected behavior: {expected_behavior}
+
+Reply:
+{response}
+
+How well does the reply show the expected behavior? Answer with a single
+number between 0 and 10 and nothing else."""
+
+CRITIQUE_PROMPT = """The following system prompt is used by a personal AI assistant:
+
+<prompt>
+{prompt}
+</prompt>
+
+It scored poorly on these tasks (score out of 1.0):
+
+{failures}
+
+Explain briefly what in the system prompt causes these failures."""
+
+REWRITE_PROMPT = """Rewrite the system prompt below to fix the problems described.
+Keep what works. Reply with the new system prompt only.
+
+<prompt>
+{prompt}
+</prompt>
+
+Problems:
+{critique}"""
 
 
 def get_initial_prompt() -> str:
@@ -77,46 +116,261 @@ def create_eval_dataset() -> list[dict]:
     ]
 
 
+class EvalCache:
+    """Evaluation results memoized by a hash of (prompt, task).
+
+    Entries are appended to a JSONL file as they are produced, so results
+    survive a crash mid-iteration.
+    """
+
+    def __init__(self, path: Path):
+        """Initialize cache.
+
+        Args:
+            path: JSONL cache file
+        """
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        self.hits = 0
+        if path.exists():
+            for line in path.read_text().splitlines():
+                if line.strip():
+                    entry = json.loads(line)
+                    self.entries[entry["key"]] = entry
+
+    @staticmethod
+    def key(prompt: str, task: dict) -> str:
+        """Hash a prompt and task into a cache key."""
+        payload = json.dumps({"prompt": prompt, "task": task}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, prompt: str, task: dict) -> Optional[dict]:
+        """Look up a cached evaluation."""
+        entry = self.entries.get(self.key(prompt, task))
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def put(self, prompt: str, task: dict, score: float, response: str) -> None:
+        """Store an evaluation."""
+        entry = {"key": self.key(prompt, task), "score": score, "response": response}
+        self.entries[entry["key"]] = entry
+        with self.path.open("a") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+class RolloutPool:
+    """Runs candidate prompts against tasks with bounded concurrency."""
+
+    def __init__(self, cache: EvalCache, concurrency: int = 4):
+        """Initialize rollout pool.
+
+        Args:
+            cache: Evaluation cache
+            concurrency: Maximum rollouts in flight
+        """
+        self.cache = cache
+        self.semaphore = asyncio.Semaphore(concurrency)
+        # Batch priority keeps training from starving interactive sessions
+        self.llm = create_chat_model(priority=BATCH)
+        self.judge = create_chat_model(temperature=0.0, priority=BATCH)
+        self.workdir = Path(tempfile.mkdtemp(prefix="amy-apo-"))
+
+    async def rollout(self, prompt: str, task: dict) -> float:
+        """Run one task with a candidate prompt and score the reply.
+
+        Args:
+            prompt: Candidate system prompt
+            task: Task with "task" and "expected_behavior"
+
+        Returns:
+            Score in [0, 1] (0 for a rollout that failed; failures are not cached)
+        """
+        cached = self.cache.get(prompt, task)
+        if cached is not None:
+            return cached["score"]
+
+        async with self.semaphore:
+            # Each rollout gets scratch memory so runs do not see each other,
+            # and no write tools, so parallel runs cannot change the workspace
+            scratch = Path(tempfile.mkdtemp(dir=self.workdir))
+            memory = MemorySystem(
+                semantic_file=str(scratch / "semantic_memory.md"),
+                episodic_dir=str(scratch / "episodic"),
+            )
+            orchestrator = Orchestrator(
+                llm=self.llm,
+                memory=memory,
+                system_prompt=prompt,
+                consolidate=False,
+                read_only=True,
+            )
+            try:
+                result = await orchestrator.run(task["task"], stream=False)
+                response = str(result["messages"][-1].content)
+            except Exception as e:
+                # Scored as a miss but not cached, so --resume retries it
+                print(f"Rollout failed: {task['task'][:40]!r}: {e}")
+                return 0.0
+
+            grade = await self.judge.ainvoke(JUDGE_PROMPT.format(response=response, **task))
+            match = re.search(r"\d+(\.\d+)?", str(grade.content))
+            score = min(10.0, float(match.group())) / 10 if match else 0.0
+
+        self.cache.put(prompt, task, score, response)
+        return score
+
+    async def evaluate(self, prompt: str, tasks: list[dict]) -> list[float]:
+        """Score a prompt on every task concurrently.
+
+        Args:
+            prompt: Candidate system prompt
+            tasks: Tasks to run
+
+        Returns:
+            Score per task
+        """
+        return list(await asyncio.gather(*(self.rollout(prompt, t) for t in tasks)))
+
+
+def mean(values: list[float]) -> float:
+    """Average of a list (0.0 if empty)."""
+    return sum(values) / len(values) if values else 0.0
+
+
+def load_checkpoint(path: Path) -> Optional[dict]:
+    """Load a training checkpoint if one exists."""
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_checkpoint(path: Path, state: dict) -> None:
+    """Write a training checkpoint atomically."""
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2))
+    os.replace(tmp, path)
+
+
+async def propose_candidates(
+    pool: RolloutPool,
+    prompt: str,
+    tasks: list[dict],
+    scores: list[float],
+    num_candidates: int,
+) -> list[str]:
+    """Critique a prompt on its weakest tasks and propose rewrites.
+
+    Args:
+        pool: Rollout pool (its LLM is used for critique and rewrites)
+        prompt: Current best prompt
+        tasks: Training tasks
+        scores: Score of the current prompt per task
+        num_candidates: Number of rewrites to propose
+
+    Returns:
+        Candidate prompts
+    """
+    ranked = sorted(zip(scores, tasks), key=lambda pair: pair[0])[:3]
+    failures = "\n".join(
+        f"- ({score:.2f}) {task['task']} -- expected: {task['expected_behavior']}"
+        for score, task in ranked
+    )
+    critique = await pool.llm.ainvoke(CRITIQUE_PROMPT.format(prompt=prompt, failures=failures))
+    rewrites = await asyncio.gather(*(
+        pool.llm.ainvoke(REWRITE_PROMPT.format(prompt=prompt, critique=critique.content))
+        for _ in range(num_candidates)
+    ))
+    return [str(r.content).strip() for r in rewrites if str(r.content).strip()]
+
+
 async def run_apo_training(
     output_path: str = "optimized_prompt.md",
     num_iterations: int = 10,
+    concurrency: int = 4,
+    num_candidates: int = 3,
+    checkpoint_dir: str = ".apo",
+    resume: bool = False,
 ) -> Optional[str]:
     """Run APO training to optimize the system prompt.
 
     Args:
         output_path: Path to save optimized prompt
         num_iterations: Number of optimization iterations
+        concurrency: Maximum rollouts in flight
+        num_candidates: Candidate prompts proposed per iteration
+        checkpoint_dir: Directory for the checkpoint and evaluation cache
+        resume: Continue from the last checkpoint in checkpoint_dir
 
     Returns:
         Optimized prompt or None if failed
     """
-    if not AGENT_LIGHTNING_AVAILABLE:
-        print("Error: agentlightning not installed")
-        return None
-
-    initial_prompt = get_initial_prompt()
+    run_dir = Path(checkpoint_dir)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint_path = run_dir / "checkpoint.json"
+    pool = RolloutPool(EvalCache(run_dir / "eval_cache.jsonl"), concurrency=concurrency)
 
     train_dataset = create_train_dataset()
     eval_dataset = create_eval_dataset()
 
-    print(f"Initial prompt:\n{initial_prompt}\n")
+    state = load_checkpoint(checkpoint_path) if resume else None
+    if state:
+        print(f"Resuming after iteration {state['iteration']} "
+              f"(best train score {state['best_score']:.3f})")
+    else:
+        initial_prompt = get_initial_prompt()
+        print(f"Initial prompt:\n{initial_prompt}\n")
+        scores = await pool.evaluate(initial_prompt, train_dataset)
+        state = {
+            "iteration": 0,
+            "best_prompt": initial_prompt,
+            "best_score": mean(scores),
+            "history": [],
+        }
+        save_checkpoint(checkpoint_path, state)
+
     print(f"Training dataset: {len(train_dataset)} examples")
     print(f"Evaluation dataset: {len(eval_dataset)} examples")
 
-    # Configure APO
-    apo_config = APOConfig(
-        initial_prompt=initial_prompt,
-        task_dataset=train_dataset,
-        eval_dataset=eval_dataset,
-        max_iterations=num_iterations,
-        evaluation_metric="helpfulness",
-    )
-
-    # Initialize APO
-    apo = APO(config=apo_config)
-
     print("\nStarting APO optimization...")
-    optimized_prompt = await apo.train()
+    try:
+        for iteration in range(state["iteration"] + 1, num_iterations + 1):
+            best_prompt = state["best_prompt"]
+            scores = await pool.evaluate(best_prompt, train_dataset)
+            candidates = await propose_candidates(
+                pool, best_prompt, train_dataset, scores, num_candidates
+            )
+            candidate_scores = await asyncio.gather(*(
+                pool.evaluate(c, train_dataset) for c in candidates
+            ))
+
+            improved = False
+            for candidate, c_scores in zip(candidates, candidate_scores):
+                if mean(c_scores) > state["best_score"]:
+                    state["best_prompt"] = candidate
+                    state["best_score"] = mean(c_scores)
+                    improved = True
+
+            state["iteration"] = iteration
+            state["history"].append({
+                "iteration": iteration,
+                "candidate_scores": [round(mean(c), 4) for c in candidate_scores],
+                "best_score": round(state["best_score"], 4),
+                "improved": improved,
+            })
+            save_checkpoint(checkpoint_path, state)
+            print(f"Iteration {iteration}/{num_iterations}: "
+                  f"best train score {state['best_score']:.3f}"
+                  f"{' (improved)' if improved else ''} "
+                  f"[cache hits: {pool.cache.hits}]")
+    except Exception as e:
+        print(f"\nAPO training stopped at iteration {state['iteration']}: {e}")
+        print(f"Resume with --resume --checkpoint-dir {checkpoint_dir}")
+        return None
+
+    optimized_prompt = state["best_prompt"]
+    eval_scores = await pool.evaluate(optimized_prompt, eval_dataset)
+    print(f"\nEvaluation score: {mean(eval_scores):.3f}")
 
     if optimized_prompt:
         # Save optimized prompt
@@ -145,12 +399,38 @@ def main():
         default=10,
         help="Number of optimization iterations",
     )
+    parser.add_argument(
+        "--concurrency", "-c",
+        type=int,
+        default=4,
+        help="Maximum rollouts in flight",
+    )
+    parser.add_argument(
+        "--candidates",
+        type=int,
+        default=3,
+        help="Candidate prompts proposed per iteration",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        default=".apo",
+        help="Directory for the checkpoint and evaluation cache",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue from the last checkpoint",
+    )
 
     args = parser.parse_args()
 
     result = asyncio.run(run_apo_training(
         output_path=args.output,
         num_iterations=args.iterations,
+        concurrency=args.concurrency,
+        num_candidates=args.candidates,
+        checkpoint_dir=args.checkpoint_dir,
+        resume=args.resume,
     ))
 
     if not result: